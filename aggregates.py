@@ -0,0 +1,331 @@
+"""Тайлангийн бүх нэгтгэлийг нэг дор тооцоолж файлд хадгална.
+
+Хуудсууд түүхий саналын хуудсаас биш энэ жижиг нэгтгэлээс уншина.
+Файл нь ballot store-ийн fingerprint-тэй холбогдсон тул store өөрчлөгдвөл
+дахин тооцоологдоно.
+
+    python aggregates.py            # data/aggregates.npz-г үүсгэнэ
+"""
+import argparse
+import functools
+import logging
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from analytics import (
+    PATTERN_LABELS,
+    PATTERN_4,
+    PATTERN_1111,
+    classify_party_patterns,
+    cross_pair_counts,
+    minority_candidates,
+    pair_counts,
+    pair_index,
+    party_mixing_matrix,
+)
+from ballot_codes import get_ballot_codes, mask_bits, missing_code
+from ballot_filters import BallotFilter, get_bitmap_index
+from data_loader import dataset_cache, dataset_fingerprint
+
+logger = logging.getLogger(__name__)
+
+AGGREGATES_PATH = "data/aggregates.npz"
+AGGREGATES_VERSION = 2
+
+LABEL_KEYS = [
+    "party_labels",
+    "city_candidate_labels",
+    "district_candidate_labels",
+]
+CANDIDATE_PARTY_KEYS = ["city_candidate_party", "district_candidate_party"]
+# Намын оролцооны bool маск – нэмэхэд OR, хасах боломжгүй
+PRESENCE_MASKS = {
+    "city_parties_present": "city_party_mask",
+    "district_parties_present": "district_party_mask",
+}
+
+
+def _bincount_nd(columns, shape):
+    """Кодын баганууд дээрх олон хэмжээст давтамжийн массив.
+
+    Аль нэг багана нь хэмжээсээс давсан (хоосон) мөр тоологдохгүй.
+    """
+    columns = [np.asarray(col, dtype=np.int64) for col in columns]
+    valid = np.ones(len(columns[0]), dtype=bool)
+    for col, dim in zip(columns, shape):
+        valid &= col < dim
+    key = np.ravel_multi_index([col[valid] for col in columns], shape)
+    return np.bincount(key, minlength=int(np.prod(shape))).reshape(shape)
+
+
+def _district_pair_keys(codes):
+    """Тойрог бүрийн нэр дэвшигчийн хос – (district_no * n_pairs + pair) түлхүүрээр."""
+    n_labels = len(codes.district_candidate_labels)
+    n_pairs = n_labels * (n_labels - 1) // 2
+    missing = missing_code(codes.district_candidate)
+
+    a = codes.district_candidate.min(axis=1)
+    b = codes.district_candidate.max(axis=1)
+    valid = (a != b) & (b != missing) & (codes.district_no >= 0)
+
+    key = (
+        codes.district_no[valid].astype(np.int64) * n_pairs
+        + pair_index(a[valid], b[valid], n_labels)
+    )
+    return np.unique(key, return_counts=True)
+
+
+def compute_aggregates(codes):
+    """BallotCodes-оос тайлангийн бүх нэгтгэлийг нэг дамжлагаар тооцоолно."""
+    n_parties = codes.n_parties
+    n_city = len(codes.city_candidate_labels)
+    n_district = len(codes.district_candidate_labels)
+
+    patterns = classify_party_patterns(codes.city_party)
+    loyal = codes.seven_of_seven_same_party
+
+    city_mixing, city_present = party_mixing_matrix(codes.city_party_mask, n_parties)
+    district_mixing, district_present = party_mixing_matrix(
+        codes.district_party_mask, n_parties
+    )
+    district_pair_keys, district_pair_key_counts = _district_pair_keys(codes)
+
+    p = (n_parties,)
+    aggs = {
+        "n_ballots": np.array(len(codes), dtype=np.int64),
+        # OVERVIEW
+        "city_party_count": np.bincount(codes.city_party_count, minlength=5),
+        "district_discipline": np.bincount(codes.district_single_party, minlength=2),
+        # PARTY MIXING
+        "city_mixing": city_mixing,
+        "city_parties_present": city_present,
+        "district_mixing": district_mixing,
+        "district_parties_present": district_present,
+        # CROSS-CONTEST ALIGNMENT
+        "alignment": np.bincount(codes.city_district_aligned, minlength=2),
+        "loyalty": np.bincount(loyal, minlength=2),
+        "loyal_party": _bincount_nd([codes.city_party[loyal, 0]], p),
+        # PARTY COMBINATION
+        "pattern": np.bincount(patterns.pattern, minlength=len(PATTERN_LABELS)),
+        "pattern_31": _bincount_nd([patterns.dominant, patterns.minority], p * 2),
+        "pattern_22": _bincount_nd([patterns.pair_a, patterns.pair_b], p * 2),
+        "pattern_211": _bincount_nd(
+            [patterns.core, patterns.other_1, patterns.other_2], p * 3
+        ),
+        "pattern_1111": _bincount_nd(
+            list(patterns.sorted_parties[patterns.mask(PATTERN_1111)].T),
+            p * 4,
+        ),
+        "pure_party": _bincount_nd(
+            [patterns.sorted_parties[patterns.mask(PATTERN_4), 0]], p
+        ),
+        "candidate_31": _bincount_nd(
+            minority_candidates(patterns, codes.city_party, codes.city_candidate),
+            (n_city, n_parties, n_parties),
+        ),
+        # CANDIDATE BEHAVIOR
+        "city_pairs": pair_counts(codes.city_candidate, n_city),
+        "district_pairs": pair_counts(codes.district_candidate, n_district),
+        "cross_pairs": cross_pair_counts(
+            codes.city_candidate, codes.district_candidate, n_city, n_district
+        ),
+        "district_pair_keys": district_pair_keys,
+        "district_pair_counts": district_pair_key_counts,
+    }
+
+    for key in LABEL_KEYS + CANDIDATE_PARTY_KEYS:
+        value = np.asarray(getattr(codes, key))
+        aggs[key] = value.astype(str) if value.dtype == object else value
+    return aggs
+
+
+def merge_aggregates(base, delta):
+    """Хоёр нэгтгэлийг нэмнэ. Бүх нэгтгэл нэмэгдэхүйц (additive) тоо.
+
+    Label хүснэгтүүд ижил байх ёстой – өөр кодчлолтой нэгтгэлийг нэмэх
+    боломжгүй.
+    """
+    for key in LABEL_KEYS:
+        if not np.array_equal(base[key], delta[key]):
+            raise ValueError(f"Aggregates use different {key}; cannot merge.")
+
+    merged = {}
+    for key, value in base.items():
+        if key in LABEL_KEYS or key in ("district_pair_keys", "district_pair_counts"):
+            merged[key] = value
+        elif key in CANDIDATE_PARTY_KEYS:
+            # batch-д гараагүй нэр дэвшигчийн нам хоосон байж болно
+            merged[key] = np.where(value == missing_code(value), delta[key], value)
+        else:
+            merged[key] = value + delta[key]
+
+    keys = np.concatenate([base["district_pair_keys"], delta["district_pair_keys"]])
+    counts = np.concatenate([base["district_pair_counts"], delta["district_pair_counts"]])
+    merged["district_pair_keys"], inverse = np.unique(keys, return_inverse=True)
+    merged["district_pair_counts"] = np.bincount(inverse, weights=counts).astype(np.int64)
+    return merged
+
+
+def subtract_aggregates(base, delta):
+    """``base``-аас түүний дэд олонлогийн нэгтгэл ``delta``-г хасна.
+
+    ``PRESENCE_MASKS`` хасагдахгүй – base-ийнх үлдэх тул дуудагч дахин тооцно.
+    """
+    unchanged = LABEL_KEYS + CANDIDATE_PARTY_KEYS + ["district_pair_keys"]
+    negated = {
+        key: value if key in unchanged
+        else np.zeros_like(value) if key in PRESENCE_MASKS
+        else -value
+        for key, value in delta.items()
+    }
+    result = merge_aggregates(base, negated)
+    keep = result["district_pair_counts"] != 0
+    result["district_pair_keys"] = result["district_pair_keys"][keep]
+    result["district_pair_counts"] = result["district_pair_counts"][keep]
+    return result
+
+
+def district_pair_tables(aggs):
+    """Бүх тойргийн хосын хүснэгтийг нэг дамжлагаар: {district_no: DataFrame}.
+
+    Хүснэгт бүр count-оор буурахаар эрэмбэлэгдсэн (candidate_a, candidate_b,
+    count) – нэр дэвшигч нь district_candidate_labels дахь код.
+    """
+    n_labels = len(aggs["district_candidate_labels"])
+    n_pairs = n_labels * (n_labels - 1) // 2
+    keys = aggs["district_pair_keys"]
+    counts = aggs["district_pair_counts"]
+
+    district = keys // n_pairs
+    order = np.lexsort((-counts, district))
+    district, pairs, counts = district[order], keys[order] % n_pairs, counts[order]
+    rows, cols = np.triu_indices(n_labels, 1)
+
+    districts, starts = np.unique(district, return_index=True)
+    bounds = np.append(starts, len(district))
+    return {
+        int(d): pd.DataFrame({
+            "candidate_a": rows[pairs[lo:hi]],
+            "candidate_b": cols[pairs[lo:hi]],
+            "count": counts[lo:hi],
+        })
+        for d, lo, hi in zip(districts, bounds[:-1], bounds[1:])
+    }
+
+
+# ======================================================
+# FILE I/O
+# ======================================================
+def save_aggregates(aggs, fingerprint, path=AGGREGATES_PATH):
+    arrays = dict(aggs)
+    arrays["version"] = np.array(AGGREGATES_VERSION)
+    arrays["fingerprint"] = np.array(fingerprint)
+
+    tmp_path = path + ".tmp.npz"
+    np.savez_compressed(tmp_path, **arrays)
+    os.replace(tmp_path, path)
+
+
+def read_aggregates(fingerprint, path=AGGREGATES_PATH):
+    """Файл байхгүй, хувилбар эсвэл fingerprint таарахгүй бол None."""
+    if not os.path.exists(path):
+        return None
+
+    with np.load(path, allow_pickle=False) as data:
+        if int(data["version"]) != AGGREGATES_VERSION:
+            return None
+        if str(data["fingerprint"]) != fingerprint:
+            return None
+        return {
+            key: data[key]
+            for key in data.files
+            if key not in ("version", "fingerprint")
+        }
+
+
+def build_aggregates(path=AGGREGATES_PATH):
+    start = time.perf_counter()
+    fingerprint = dataset_fingerprint()
+    aggs = compute_aggregates(get_ballot_codes())
+    save_aggregates(aggs, fingerprint, path)
+    logger.info(
+        "Aggregates built for %d ballots in %.2fs -> %s",
+        int(aggs["n_ballots"]),
+        time.perf_counter() - start,
+        path,
+    )
+    return aggs
+
+
+def get_aggregates(ballot_filter=None):
+    """Тайлангийн нэгтгэл – массивууд зөвхөн уншигдана.
+
+    ``ballot_filter`` (ballot_filters.BallotFilter) өгвөл зөвхөн шүүлтэд
+    тохирох саналын хуудсуудаар дахин тооцоолно.
+    """
+    if not ballot_filter:
+        return _stored_aggregates()
+    return _filtered_aggregates(ballot_filter)
+
+
+@dataset_cache(show_spinner=True, max_entries=1)
+def _stored_aggregates():
+    """Процесс бүрт нэг л хувь хадгалагдах бүтэн нэгтгэл."""
+    aggs = read_aggregates(dataset_fingerprint())
+    if aggs is None:
+        aggs = build_aggregates()
+    return _read_only(aggs)
+
+
+@dataset_cache(show_spinner=True, max_entries=8)
+def _filtered_aggregates(ballot_filter):
+    """Шүүлтэд тохирох хуудсуудын нэгтгэл.
+
+    Сонгосон хуудсууд талаас олон бол үлдсэнийх нь нэгтгэлийг бүтэн
+    нэгтгэлээс хасна – ямар ч шүүлтэд хуудсын талаас илүүг тооцохгүй.
+    """
+    index = get_bitmap_index()
+    codes = get_ballot_codes()
+    rows = index.rows(ballot_filter)
+    if len(rows) * 2 <= index.n_rows:
+        if ballot_filter == BallotFilter(districts=ballot_filter.districts):
+            # Тойрог бүр үргэлжилсэн муж – хуулбаргүй view-уудын нэгтгэлийг нэмнэ
+            return _read_only(functools.reduce(merge_aggregates, (
+                compute_aggregates(codes.district(d))
+                for d in ballot_filter.districts if d in codes.districts
+            )))
+        return _read_only(compute_aggregates(codes.take(rows)))
+
+    rest = compute_aggregates(codes.take(index.rows(ballot_filter, invert=True)))
+    aggs = subtract_aggregates(_stored_aggregates(), rest)
+    for key, mask in PRESENCE_MASKS.items():
+        masks = getattr(codes, mask)[rows]
+        aggs[key] = mask_bits(np.bitwise_or.reduce(masks, keepdims=True), codes.n_parties)[0]
+    return _read_only(aggs)
+
+
+def _read_only(aggs):
+    for value in aggs.values():
+        value.setflags(write=False)
+    return aggs
+
+
+@dataset_cache(show_spinner=False, max_entries=8)
+def get_district_pair_tables(ballot_filter=None):
+    return district_pair_tables(get_aggregates(ballot_filter))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--output", default=AGGREGATES_PATH)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    build_aggregates(args.output)
+
+
+if __name__ == "__main__":
+    main()
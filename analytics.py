@@ -0,0 +1,218 @@
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from ballot_codes import mask_bits, missing_code
+
+
+# ======================================================
+# НАМЫН ХОСЛОЛЫН ХЭВ ШИНЖ (4 / 3-1 / 2-2 / 2-1-1 / 1-1-1-1)
+# ======================================================
+PATTERN_LABELS = np.array(["4", "3-1", "2-2", "2-1-1", "1-1-1-1"], dtype=object)
+PATTERN_4, PATTERN_31, PATTERN_22, PATTERN_211, PATTERN_1111 = range(5)
+
+# Мөрийг эрэмбэлсний дараа хөрш баганууд тэнцүү эсэхийг 3 бит болгоно:
+# key = (s0 == s1) + 2 * (s1 == s2) + 4 * (s2 == s3).
+# Доорх хүснэгтүүд key бүрт хэв шинж, аль баганаас ямар нам авахыг заана.
+_PATTERN_BY_KEY = np.array([
+    PATTERN_1111,   # 000
+    PATTERN_211,    # 001  AA B C
+    PATTERN_211,    # 010  A BB C
+    PATTERN_31,     # 011  AAA B
+    PATTERN_211,    # 100  A B CC
+    PATTERN_22,     # 101  AA BB
+    PATTERN_31,     # 110  A BBB
+    PATTERN_4,      # 111  AAAA
+], dtype=np.uint8)
+_MINORITY_COL = np.array([0, 0, 0, 3, 0, 0, 0, 0])
+_CORE_COL = np.array([0, 0, 1, 0, 2, 0, 0, 0])
+_OTHER_1_COL = np.array([0, 2, 0, 0, 0, 0, 0, 0])
+_OTHER_2_COL = np.array([0, 3, 3, 0, 1, 0, 0, 0])
+
+
+@dataclass(frozen=True)
+class PartyPatterns:
+    """Хотын 4 сонголтын намын хослолын ангилал (мөр бүрт).
+
+    Тухайн хэв шинжид хамааралгүй талбар ``missing_code(...)`` утгатай.
+    """
+
+    pattern: np.ndarray          # PATTERN_LABELS дахь индекс
+    sorted_parties: np.ndarray   # (n, 4) мөр бүрийн эрэмбэлсэн намын код
+    dominant: np.ndarray         # 3-1: 3 санал авсан нам
+    minority: np.ndarray         # 3-1: 1 санал авсан нам
+    pair_a: np.ndarray           # 2-2: эхний нам
+    pair_b: np.ndarray           # 2-2: хоёр дахь нам
+    core: np.ndarray             # 2-1-1: 2 санал авсан нам
+    other_1: np.ndarray          # 2-1-1: нэмэлт намууд (эрэмбэлсэн)
+    other_2: np.ndarray
+
+    def mask(self, pattern):
+        return self.pattern == pattern
+
+
+def classify_party_patterns(party_codes):
+    """(n, 4) намын кодын матрицыг run length-ээр нь ангилна."""
+    s = np.sort(party_codes, axis=1)
+    eq = s[:, 1:] == s[:, :-1]
+    key = eq[:, 0] + 2 * eq[:, 1] + 4 * eq[:, 2]
+    pattern = _PATTERN_BY_KEY[key]
+
+    rows = np.arange(len(s))
+    missing = missing_code(s)
+
+    def pick(cols, pattern_id):
+        return np.where(pattern == pattern_id, s[rows, cols[key]], missing).astype(s.dtype)
+
+    return PartyPatterns(
+        pattern=pattern,
+        sorted_parties=s,
+        dominant=np.where(pattern == PATTERN_31, s[:, 1], missing).astype(s.dtype),
+        minority=pick(_MINORITY_COL, PATTERN_31),
+        pair_a=np.where(pattern == PATTERN_22, s[:, 0], missing).astype(s.dtype),
+        pair_b=np.where(pattern == PATTERN_22, s[:, 2], missing).astype(s.dtype),
+        core=pick(_CORE_COL, PATTERN_211),
+        other_1=pick(_OTHER_1_COL, PATTERN_211),
+        other_2=pick(_OTHER_2_COL, PATTERN_211),
+    )
+
+
+def minority_candidates(patterns, party_codes, candidate_codes):
+    """3-1 хуудас бүрээс цөөнх намын нэр дэвшигчийг гаргана.
+
+    Returns: (candidate, minority_party, dominant_party) кодын массивууд.
+    """
+    rows = np.flatnonzero(patterns.mask(PATTERN_31))
+    minority = patterns.minority[rows]
+    col = np.argmax(party_codes[rows] == minority[:, None], axis=1)
+    return candidate_codes[rows, col], minority, patterns.dominant[rows]
+
+
+# ======================================================
+# ДАВТАМЖИЙН ХҮСНЭГТ
+# ======================================================
+def count_table(counts, labels, names):
+    """Олон хэмжээст давтамжийн массивыг value_counts шиг хүснэгт болгоно.
+
+    ``labels`` нь тэнхлэг бүрийн label массив, ``names`` нь баганын нэр.
+    Зөвхөн 0-ээс ялгаатай нүднүүд count-оор буурахаар эрэмбэлэгдэнэ.
+    """
+    flat = counts.ravel()
+    nonzero = np.flatnonzero(flat)
+    order = nonzero[np.argsort(-flat[nonzero], kind="stable")]
+    coords = np.unravel_index(order, counts.shape)
+
+    out = pd.DataFrame({
+        name: np.asarray(axis_labels)[coord]
+        for name, axis_labels, coord in zip(names, labels, coords)
+    })
+    out["count"] = flat[order]
+    return out
+
+
+# ======================================================
+# НЭР ДЭВШИГЧДИЙН ХАМТ СОНГОГДОЛТ (CO-VOTE PAIRS)
+# ======================================================
+def candidate_party_labels(party_labels, candidate_party, unknown="UNK"):
+    """Нэр дэвшигч бүрийн намын нэр (нам нь тодорхойгүй бол ``unknown``)."""
+    labels = np.append(np.asarray(party_labels, dtype=object), unknown)
+    return labels[np.minimum(candidate_party, len(party_labels))]
+
+
+def pair_index(a, b, n_labels):
+    """a < b хосын дээд гурвалжин дахь индекс (np.triu_indices(n, 1)-ийн дараалал)."""
+    a = a.astype(np.int64)
+    b = b.astype(np.int64)
+    return a * (2 * n_labels - a - 1) // 2 + (b - a - 1)
+
+
+def pair_counts(candidate_codes, n_labels):
+    """(n, k) нэр дэвшигчийн кодоос хамт сонгогдсон хосын тэгш хэмтэй матриц.
+
+    Хуудас бүрийн k сонголтоос k(k-1)/2 багана үүсгэж, бүгдийг нэг
+    ``np.bincount``-оор тоолно. Давхардсан болон хоосон сонголт хос
+    үүсгэхгүй.
+    """
+    missing = missing_code(candidate_codes)
+    k = candidate_codes.shape[1]
+
+    # Мөрийг эрэмбэлж давхардсан сонголтыг хоосон болгоно (sorted(set(row)))
+    s = np.sort(candidate_codes, axis=1)
+    s[:, 1:][s[:, 1:] == s[:, :-1]] = missing
+
+    indices = []
+    for i in range(k):
+        for j in range(i + 1, k):
+            a, b = s[:, i], s[:, j]
+            valid = (a != missing) & (b != missing)
+            indices.append(pair_index(a[valid], b[valid], n_labels))
+
+    n_pairs = n_labels * (n_labels - 1) // 2
+    flat = np.bincount(np.concatenate(indices), minlength=n_pairs)
+
+    matrix = np.zeros((n_labels, n_labels), dtype=np.int64)
+    rows, cols = np.triu_indices(n_labels, 1)
+    matrix[rows, cols] = flat
+    matrix[cols, rows] = flat
+    return matrix
+
+
+def cross_pair_counts(codes_a, codes_b, n_a, n_b):
+    """Хоёр өөр сонгуулийн нэр дэвшигчдийн хамт сонгогдолт – (n_a, n_b) матриц.
+
+    Хуудас бүрт давхардсан сонголт нэг л удаа тоологдоно.
+    """
+    def unique_codes(codes):
+        s = np.sort(codes, axis=1)
+        s[:, 1:][s[:, 1:] == s[:, :-1]] = missing_code(s)
+        return s
+
+    a_codes, b_codes = unique_codes(codes_a), unique_codes(codes_b)
+    missing_a, missing_b = missing_code(a_codes), missing_code(b_codes)
+
+    flat = np.zeros(n_a * n_b, dtype=np.int64)
+    for a in a_codes.T:
+        for b in b_codes.T:
+            valid = (a != missing_a) & (b != missing_b)
+            flat += np.bincount(
+                a[valid].astype(np.int64) * n_b + b[valid], minlength=n_a * n_b
+            )
+    return flat.reshape(n_a, n_b)
+
+
+def top_pairs(matrix, labels, k=None):
+    """Хосын матрицаас count-оор эрэмбэлсэн (candidate_a, candidate_b, count) хүснэгт."""
+    rows, cols = np.triu_indices(len(labels), 1)
+    counts = matrix[rows, cols]
+    nonzero = np.flatnonzero(counts)
+    order = nonzero[np.argsort(-counts[nonzero], kind="stable")]
+    if k is not None:
+        order = order[:k]
+
+    return pd.DataFrame({
+        "candidate_a": labels[rows[order]],
+        "candidate_b": labels[cols[order]],
+        "count": counts[order],
+    })
+
+
+# ======================================================
+# НАМУУДЫН ХОЛИГДОЛ (PARTY MIXING)
+# ======================================================
+def party_mixing_matrix(party_masks, n_parties):
+    """Холимог хуудсууд дээрх нам хоорондын хамт сонгогдолт.
+
+    ``party_masks`` нь хуудас бүрийн намын bitmask. Ялгаатай маскийн тоо
+    цөөн тул маск бүрийг нэг удаа задалж, давтамжаар нь жигнэнэ.
+    Диагональ нь 0; ``present`` нь тухайн сонгуульд гарсан намуудын маск.
+    """
+    present = mask_bits(np.bitwise_or.reduce(party_masks, keepdims=True), n_parties)[0]
+
+    masks, counts = np.unique(party_masks, return_counts=True)
+    mixed = np.bitwise_count(masks) > 1
+    bits = mask_bits(masks[mixed], n_parties).astype(np.int64)
+    matrix = bits.T @ (bits * counts[mixed, None])
+
+    np.fill_diagonal(matrix, 0)
+    return matrix, present
@@ -1,5 +1,12 @@
 import streamlit as st
 import hashlib
+import logging
+
+from ballot_filters import keep_filters, render_filter_sidebar
+from memory_cache import render_cache_panel
+from page_timing import page_run, render_timing_panel
+
+logging.basicConfig(level=logging.INFO)
 
 st.set_page_config(page_title="Тайлан", layout="wide")
 
@@ -7,6 +14,8 @@ st.set_page_config(page_title="Тайлан", layout="wide")
 # 1. Load users from secrets
 # ---------------------------
 USERS = st.secrets["users"]
+# Хугацааны самбарыг харах хэрэглэгчид (secrets.toml: admins = ["..."])
+ADMINS = set(st.secrets.get("admins", ["admin"]))
 #st.write("Loaded users:", list(USERS.keys()))
 # ---------------------------
 # 2. Session state init
@@ -52,9 +61,10 @@ with st.sidebar:
 # ---------------------------
 # 6. Navigation
 # ---------------------------
+home_page = st.Page("home.py", title="ДАТАСЕТ ТОВЧ ТАЙЛАН")
 pages = {
     "Эхлэл": [
-        st.Page("home.py", title="ДАТАСЕТ ТОВЧ ТАЙЛАН"),
+        home_page,
     ],
     "Тайлан": [
         st.Page("page1.py", title="OVERVIEW"),
@@ -66,4 +76,29 @@ pages = {
 }
 
 pg = st.navigation(pages)
-pg.run()
+
+# ---------------------------
+# 7. Admin: хуудасны хугацаа, cache-ийн санах ойн самбар
+# ---------------------------
+# Шүүлт sidebar-т дээр нь харагдана; admin самбарыг хуудас ажиллахаас өмнө
+# зурна – st.stop/exception гарсан ч харагдана
+filter_sidebar = st.sidebar.container()
+if st.session_state.username in ADMINS:
+    with st.sidebar:
+        render_timing_panel()
+        render_cache_panel()
+
+# ---------------------------
+# 8. Шүүлт (зөвхөн тайлангийн хуудсанд) ба хуудас
+# ---------------------------
+with page_run(pg.title):
+    if pg.url_path == home_page.url_path:
+        # Эхлэл шүүлт ашигладаггүй; сонгосон утгыг дараагийн хуудсанд хадгална
+        keep_filters()
+    else:
+        with filter_sidebar:
+            ballot_filter, n_selected = render_filter_sidebar()
+        if ballot_filter and not n_selected:
+            st.warning("Шүүлтэд тохирох саналын хуудас алга")
+            st.stop()
+    pg.run()
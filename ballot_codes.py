@@ -0,0 +1,256 @@
+from dataclasses import dataclass, replace
+from functools import cached_property
+
+import numpy as np
+import pandas as pd
+
+from data_loader import (
+    CITY_CANDIDATE_COLS,
+    CITY_PARTY_COLS,
+    DISTRICT_CANDIDATE_COLS,
+    DISTRICT_PARTY_COLS,
+    dataset_cache,
+    load_data,
+    to_compact_dtypes,
+)
+
+
+def code_dtype(n_labels):
+    """Label-ийн тоонд багтах хамгийн жижиг unsigned төрөл (max утга = хоосон)."""
+    return np.uint8 if n_labels < np.iinfo(np.uint8).max else np.uint16
+
+
+def missing_code(codes):
+    """Хоосон (NaN) утгыг илэрхийлэх код – тухайн төрлийн max утга."""
+    return np.iinfo(codes.dtype).max
+
+
+def mask_dtype(n_parties):
+    """Нам бүрт нэг бит багтах хамгийн жижиг unsigned төрөл."""
+    for dtype in (np.uint16, np.uint32, np.uint64):
+        if n_parties <= np.iinfo(dtype).bits:
+            return dtype
+    raise ValueError(f"{n_parties} parties do not fit in a 64-bit party mask.")
+
+
+# Мөр бүрт нэг утгатай талбарууд (district-аар эрэмбэлэгдэнэ)
+ROW_FIELDS = [
+    "city_party",
+    "district_party",
+    "city_candidate",
+    "district_candidate",
+    "district_no",
+]
+
+
+@dataclass(frozen=True)
+class BallotCodes:
+    """Саналын хуудсыг бүхэл тоон матриц болгон кодолсон хэлбэр.
+
+    Мөр бүр нэг саналын хуудас. Код бүр ``*_labels`` массив дахь индекс,
+    хоосон утга нь ``missing_code(...)``.
+    """
+
+    city_party: np.ndarray            # (n, 4) uint8
+    district_party: np.ndarray        # (n, 2) uint8
+    city_candidate: np.ndarray        # (n, 4) uint8
+    district_candidate: np.ndarray    # (n, 2) uint8/uint16
+    district_no: np.ndarray           # (n,) int16, -1 = хоосон, эрэмбэлэгдсэн
+    party_labels: np.ndarray
+    city_candidate_labels: np.ndarray
+    district_candidate_labels: np.ndarray
+    city_candidate_party: np.ndarray      # нэр дэвшигч бүрийн намын код
+    district_candidate_party: np.ndarray
+    districts: np.ndarray             # district_no-ийн давхардаагүй утгууд
+    district_offsets: np.ndarray      # districts[i]-ийн мөрүүд: offsets[i]:offsets[i + 1]
+
+    def __len__(self):
+        return self.city_party.shape[0]
+
+    @property
+    def n_parties(self):
+        return len(self.party_labels)
+
+    # ======================================================
+    # DERIVED COLUMNS (анх хэрэглэхэд нэг удаа тооцоологдоно)
+    # ======================================================
+    # Намын олонлогийн bitmask: i-р бит = party_labels[i] хуудсан дээр байгаа
+    @cached_property
+    def city_party_mask(self):
+        return _read_only(party_mask(self.city_party, self.n_parties))
+
+    @cached_property
+    def district_party_mask(self):
+        return _read_only(party_mask(self.district_party, self.n_parties))
+
+    @cached_property
+    def ballot_party_mask(self):
+        """Хот + дүүргийн 6 сонголтын намын олонлог."""
+        return _read_only(self.city_party_mask | self.district_party_mask)
+
+    @cached_property
+    def city_party_count(self):
+        """Хотын 4 сонголт дахь ялгаатай намын тоо (popcount)."""
+        return _read_only(np.bitwise_count(self.city_party_mask))
+
+    @cached_property
+    def city_single_party(self):
+        return _read_only(self.city_party_count == 1)
+
+    @cached_property
+    def district_single_party(self):
+        """Дүүргийн 2 сонголт хоёулаа бөглөгдсөн, нэг нам."""
+        return _read_only(
+            (np.bitwise_count(self.district_party_mask) == 1)
+            & (self.district_party != missing_code(self.district_party)).all(axis=1)
+        )
+
+    @cached_property
+    def city_district_aligned(self):
+        """Дүүргийн 1-р сонголтын нам хотын 4 сонголтын аль нэгтэй таарсан эсэх."""
+        district_party_1 = party_mask(self.district_party[:, :1], self.n_parties)
+        return _read_only((self.city_party_mask & district_party_1) != 0)
+
+    @cached_property
+    def seven_of_seven_same_party(self):
+        """Хотын 4, дүүргийн 2 сонголт бүгд бөглөгдсөн, нэг нам – нэг биттэй ижил маск."""
+        return _read_only(
+            self.city_single_party
+            & self.district_single_party
+            & (self.city_party_mask == self.district_party_mask)
+            & (self.city_party != missing_code(self.city_party)).all(axis=1)
+        )
+
+    def materialize(self):
+        """Бүх derived баганыг одоо тооцоолно.
+
+        Cache-д хийхээс өмнө дуудна – memory_cache хэмжээг нэг л удаа
+        (оруулах үед) тооцдог тул хожим нэмэгдсэн массив тоологдохгүй.
+        """
+        for name, attr in vars(type(self)).items():
+            if isinstance(attr, cached_property):
+                getattr(self, name)
+        return self
+
+    def district(self, district_no):
+        """Нэг тойргийн саналын хуудсууд – хуулбаргүй (view) BallotCodes."""
+        i = np.searchsorted(self.districts, district_no)
+        if i == len(self.districts) or self.districts[i] != district_no:
+            raise KeyError(district_no)
+        rows = slice(self.district_offsets[i], self.district_offsets[i + 1])
+        return replace(
+            self,
+            **{key: getattr(self, key)[rows] for key in ROW_FIELDS},
+            districts=self.districts[i:i + 1],
+            district_offsets=np.array([0, rows.stop - rows.start]),
+        )
+
+    def take(self, rows):
+        """Өсөх эрэмбэтэй мөрийн индексүүдийн BallotCodes (district эрэмбэ хадгалагдана).
+
+        Аль хэдийн тооцоолсон derived баганыг дахин тооцохгүй, хэрчиж авна.
+        """
+        district_no = _read_only(self.district_no[rows])
+        districts, starts = np.unique(district_no, return_index=True)
+        subset = replace(
+            self,
+            **{key: _read_only(getattr(self, key)[rows]) for key in ROW_FIELDS
+               if key != "district_no"},
+            district_no=district_no,
+            districts=districts,
+            district_offsets=np.append(starts, len(district_no)),
+        )
+        for key, value in vars(self).items():
+            if isinstance(getattr(type(self), key, None), cached_property):
+                subset.__dict__[key] = _read_only(value[rows])
+        return subset
+
+
+def _read_only(array):
+    array.setflags(write=False)
+    return array
+
+
+def _code_matrix(df, cols, n_labels, order):
+    dtype = code_dtype(n_labels)
+    codes = np.column_stack([df[c].cat.codes.to_numpy()[order] for c in cols])
+    codes = np.where(codes < 0, np.iinfo(dtype).max, codes).astype(dtype)
+    codes.setflags(write=False)
+    return codes
+
+
+def _candidate_party(candidates, parties, n_candidates):
+    out = np.full(n_candidates, missing_code(parties), dtype=parties.dtype)
+    valid = (candidates != missing_code(candidates)) & (parties != missing_code(parties))
+    out[candidates[valid]] = parties[valid]
+    out.setflags(write=False)
+    return out
+
+
+def encode_ballots(df):
+    """load_data()-ийн frame-ээс BallotCodes үүсгэнэ.
+
+    Мөрүүд district_no-оор эрэмбэлэгдэх тул нэг тойргийн хуудсууд
+    ``district_offsets``-ийн заасан үргэлжилсэн муж болно.
+    """
+    if not all(isinstance(df[c].dtype, pd.CategoricalDtype) for c in CITY_PARTY_COLS):
+        df = to_compact_dtypes(df)
+
+    party_labels = np.asarray(df[CITY_PARTY_COLS[0]].cat.categories, dtype=object)
+    city_labels = np.asarray(df[CITY_CANDIDATE_COLS[0]].cat.categories, dtype=object)
+    district_labels = np.asarray(df[DISTRICT_CANDIDATE_COLS[0]].cat.categories, dtype=object)
+
+    district_no = df["district_no"].to_numpy(dtype="int16", na_value=-1)
+    order = np.argsort(district_no, kind="stable")
+    district_no = district_no[order]
+    district_no.setflags(write=False)
+    districts, starts = np.unique(district_no, return_index=True)
+
+    city_party = _code_matrix(df, CITY_PARTY_COLS, len(party_labels), order)
+    district_party = _code_matrix(df, DISTRICT_PARTY_COLS, len(party_labels), order)
+    city_candidate = _code_matrix(df, CITY_CANDIDATE_COLS, len(city_labels), order)
+    district_candidate = _code_matrix(df, DISTRICT_CANDIDATE_COLS, len(district_labels), order)
+
+    return BallotCodes(
+        city_party=city_party,
+        district_party=district_party,
+        city_candidate=city_candidate,
+        district_candidate=district_candidate,
+        district_no=district_no,
+        party_labels=party_labels,
+        city_candidate_labels=city_labels,
+        district_candidate_labels=district_labels,
+        city_candidate_party=_candidate_party(
+            city_candidate.ravel(), city_party.ravel(), len(city_labels)
+        ),
+        district_candidate_party=_candidate_party(
+            district_candidate.ravel(), district_party.ravel(), len(district_labels)
+        ),
+        districts=districts,
+        district_offsets=np.append(starts, len(district_no)),
+    )
+
+
+def party_mask(codes, n_parties):
+    """(n, k) намын кодыг мөр бүрийн намын олонлогийн bitmask болгоно.
+
+    Хоосон код 0 бит өгнө.
+    """
+    dtype = mask_dtype(n_parties)
+    bits = np.zeros(int(missing_code(codes)) + 1, dtype=dtype)
+    bits[:n_parties] = np.left_shift(dtype(1), np.arange(n_parties, dtype=dtype))
+    # Баганаар нь OR хийх нь reduce(axis=1)-ээс хурдан (багана цөөн)
+    mask = bits[codes[:, 0]]
+    for col in codes.T[1:]:
+        mask |= bits[col]
+    return mask
+
+
+def mask_bits(masks, n_parties):
+    """(n,) bitmask -> (n, n_parties) bool матриц."""
+    return ((masks[:, None] >> np.arange(n_parties, dtype=masks.dtype)) & 1).astype(bool)
+
+
+@dataset_cache(show_spinner=True, max_entries=1)
+def get_ballot_codes():
+    return encode_ballots(load_data()).materialize()
@@ -0,0 +1,221 @@
+"""Бүх хуудсанд үйлчлэх sidebar шүүлт – утга бүрийн bitmap индекс.
+
+Тойрог, нам (хуудсан дээр байгаа), хотын намын хослолын бүтэц, 6/6-ийн
+утга бүрт саналын хуудсуудын bitmap-ийг (мөр бүрт нэг бит) урьдчилан
+тооцоолно. Нэг талбарын сонгосон утгуудыг OR, талбаруудыг хооронд нь AND
+хийж, үлдсэн мөрүүдээр нэгтгэлийг дахин тооцоолно (aggregates.get_aggregates).
+Намын шүүлт нь сонгосон БҮХ нам хуудсан дээр байхыг шаардана.
+
+    python ballot_filters.py --district 7 --party МАН --pattern 3-1
+"""
+import argparse
+import logging
+import time
+from dataclasses import dataclass
+
+import numpy as np
+import streamlit as st
+
+from analytics import PATTERN_LABELS, classify_party_patterns
+from ballot_codes import get_ballot_codes
+from data_loader import dataset_cache
+
+logger = logging.getLogger(__name__)
+
+DISTRICT, PARTY, PATTERN, LOYALTY = "district", "party", "pattern", "loyalty"
+
+# Sidebar widget-уудын session_state түлхүүр
+FILTER_KEYS = {
+    DISTRICT: "filter_districts",
+    PARTY: "filter_parties",
+    PATTERN: "filter_patterns",
+    LOYALTY: "filter_loyalty",
+}
+LOYALTY_LABELS = {None: "Бүгд", True: "6/6 нэг нам", False: "6/6 биш"}
+
+
+@dataclass(frozen=True)
+class BallotFilter:
+    """Сонгосон утгууд. Хоосон tuple / None = тухайн талбараар шүүхгүй."""
+
+    districts: tuple = ()
+    parties: tuple = ()
+    patterns: tuple = ()
+    loyalty: bool | None = None
+
+    def __bool__(self):
+        return bool(self.districts or self.parties or self.patterns) or self.loyalty is not None
+
+
+# ======================================================
+# BITMAP INDEX
+# ======================================================
+def _pack(mask):
+    """bool (n,) -> uint64 үгс (бит i = мөр i)."""
+    bits = np.packbits(mask, bitorder="little")
+    bits = np.pad(bits, (0, -len(bits) % 8))
+    return bits.view(np.uint64)
+
+
+class BitmapIndex:
+    """(талбар, утга) бүрийн саналын хуудсын bitmap."""
+
+    def __init__(self, n_rows, bitmaps):
+        self.n_rows = n_rows
+        self.bitmaps = bitmaps
+        for words in bitmaps.values():
+            words.setflags(write=False)
+
+    @property
+    def nbytes(self):
+        return sum(words.nbytes for words in self.bitmaps.values())
+
+    def values(self, facet):
+        return [value for f, value in self.bitmaps if f == facet]
+
+    def _any_of(self, facet, values):
+        words = np.zeros((self.n_rows + 63) // 64, dtype=np.uint64)
+        for value in values:
+            bitmap = self.bitmaps.get((facet, value))
+            if bitmap is not None:
+                words |= bitmap
+        return words
+
+    def resolve(self, ballot_filter):
+        """Шүүлтэд тохирох мөрүүдийн bitmap."""
+        words = np.full((self.n_rows + 63) // 64, np.iinfo(np.uint64).max, dtype=np.uint64)
+        if ballot_filter.districts:
+            words &= self._any_of(DISTRICT, ballot_filter.districts)
+        for party in ballot_filter.parties:
+            words &= self._any_of(PARTY, [party])
+        if ballot_filter.patterns:
+            words &= self._any_of(PATTERN, ballot_filter.patterns)
+        if ballot_filter.loyalty is not None:
+            words &= self._any_of(LOYALTY, [ballot_filter.loyalty])
+        return words
+
+    def rows(self, ballot_filter, invert=False):
+        """Шүүлтэд тохирох (``invert`` бол тохирохгүй) мөрийн индексүүд, өсөх эрэмбээр."""
+        words = self.resolve(ballot_filter)
+        if invert:
+            words = ~words
+        bits = np.unpackbits(words.view(np.uint8), count=self.n_rows, bitorder="little")
+        return np.flatnonzero(bits)
+
+    def count(self, ballot_filter):
+        # Сүүлийн үгийн n_rows-оос хойших битүүд 1 байж болно
+        words = self.resolve(ballot_filter)
+        tail = self.n_rows % 64
+        if tail:
+            words[-1] &= np.uint64((1 << tail) - 1)
+        return int(np.bitwise_count(words).sum())
+
+
+def build_bitmap_index(codes):
+    """BallotCodes-оос талбар бүрийн утга бүрийн bitmap."""
+    start = time.perf_counter()
+    bitmaps = {}
+    for district in codes.districts[codes.districts >= 0]:
+        bitmaps[DISTRICT, int(district)] = _pack(codes.district_no == district)
+
+    masks = codes.ballot_party_mask
+    for i, party in enumerate(codes.party_labels):
+        bitmaps[PARTY, party] = _pack(((masks >> masks.dtype.type(i)) & 1).astype(bool))
+
+    patterns = classify_party_patterns(codes.city_party).pattern
+    for i, label in enumerate(PATTERN_LABELS):
+        bitmaps[PATTERN, label] = _pack(patterns == i)
+
+    loyal = codes.seven_of_seven_same_party
+    bitmaps[LOYALTY, True] = _pack(loyal)
+    bitmaps[LOYALTY, False] = _pack(~loyal)
+
+    index = BitmapIndex(len(codes), bitmaps)
+    logger.info(
+        "Bitmap index: %d bitmaps, %.1f MB in %.2fs",
+        len(bitmaps), index.nbytes / 1024 ** 2, time.perf_counter() - start,
+    )
+    return index
+
+
+@dataset_cache(max_entries=1)
+def get_bitmap_index():
+    return build_bitmap_index(get_ballot_codes())
+
+
+# ======================================================
+# SIDEBAR
+# ======================================================
+def active_filter():
+    """Sidebar-аас сонгосон шүүлт. Sidebar байхгүй (export, дан хуудас) бол хоосон."""
+    state = st.session_state
+    return BallotFilter(
+        districts=tuple(state.get(FILTER_KEYS[DISTRICT], ())),
+        parties=tuple(state.get(FILTER_KEYS[PARTY], ())),
+        patterns=tuple(state.get(FILTER_KEYS[PATTERN], ())),
+        loyalty=state.get(FILTER_KEYS[LOYALTY]),
+    )
+
+
+def _clear_filters():
+    for key in FILTER_KEYS.values():
+        st.session_state.pop(key, None)
+
+
+def keep_filters():
+    """Шүүлтийн widget зурагдаагүй ажиллалтад сонгосон утгыг хадгална.
+
+    Streamlit зурагдаагүй widget-ийн түлхүүрийг session_state-аас устгадаг.
+    """
+    for key in FILTER_KEYS.values():
+        if key in st.session_state:
+            st.session_state[key] = st.session_state[key]
+
+
+def render_filter_sidebar():
+    """Sidebar-ын шүүлтүүд. Сонгосон шүүлт болон тохирох хуудсын тоог буцаана."""
+    index = get_bitmap_index()
+    st.subheader("Шүүлт")
+    st.multiselect("Тойрог", index.values(DISTRICT), key=FILTER_KEYS[DISTRICT])
+    st.multiselect("Нам (хуудсан дээр байгаа)", index.values(PARTY), key=FILTER_KEYS[PARTY])
+    st.multiselect("Хотын намын хослол", index.values(PATTERN), key=FILTER_KEYS[PATTERN])
+    st.selectbox(
+        "6/6 нэг нам",
+        list(LOYALTY_LABELS),
+        format_func=LOYALTY_LABELS.get,
+        key=FILTER_KEYS[LOYALTY],
+    )
+
+    ballot_filter = active_filter()
+    n_selected = index.count(ballot_filter)
+    if ballot_filter:
+        st.caption(f"Сонгогдсон: {n_selected:,} / {index.n_rows:,} саналын хуудас")
+        st.button("Шүүлт цэвэрлэх", on_click=_clear_filters)
+    return ballot_filter, n_selected
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--district", nargs="*", type=int, default=[])
+    parser.add_argument("--party", nargs="*", default=[])
+    parser.add_argument("--pattern", nargs="*", default=[], choices=list(PATTERN_LABELS))
+    parser.add_argument("--loyalty", choices=["yes", "no"])
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    index = build_bitmap_index(get_ballot_codes())
+    ballot_filter = BallotFilter(
+        districts=tuple(args.district),
+        parties=tuple(args.party),
+        patterns=tuple(args.pattern),
+        loyalty=None if args.loyalty is None else args.loyalty == "yes",
+    )
+    start = time.perf_counter()
+    rows = index.rows(ballot_filter)
+    logger.info(
+        "%d / %d ballots match in %.4fs", len(rows), index.n_rows, time.perf_counter() - start
+    )
+
+
+if __name__ == "__main__":
+    main()
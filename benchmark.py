@@ -0,0 +1,222 @@
+"""Хуудсуудын тооцооллын benchmark – синтетик өгөгдлийн хэд хэдэн хэмжээгээр.
+
+Тооцоолол бүрийн хугацаа, санах ойн оргил, throughput-ыг JSON-д бичнэ.
+``--compare`` нь хадгалсан baseline-тай харьцуулж удааширсныг (regression)
+илрүүлбэл 1 кодоор гарна.
+
+    python benchmark.py --sizes 10k 100k 1M --output bench_results.json
+    python benchmark.py --sizes 10k 100k 1M --compare bench_baseline.json
+"""
+import argparse
+import json
+import logging
+import platform
+import sys
+import time
+import tracemalloc
+from dataclasses import replace
+
+import numpy as np
+import pandas as pd
+
+from aggregates import _district_pair_keys, compute_aggregates
+from analytics import (
+    classify_party_patterns,
+    cross_pair_counts,
+    pair_counts,
+    party_mixing_matrix,
+)
+from ballot_codes import encode_ballots
+from ballot_filters import DISTRICT, BallotFilter, build_bitmap_index
+from data_loader import to_compact_dtypes
+from synth_ballots import generate_ballots
+
+logger = logging.getLogger(__name__)
+
+SIZES = {
+    "10k": 10_000,
+    "100k": 100_000,
+    "1M": 1_000_000,
+    "10M": 10_000_000,
+}
+REGRESSION_THRESHOLD = 0.2
+# Хоёулаа үүнээс богино хэмжилтийг шуугиан гэж үзэж харьцуулахгүй
+MIN_REGRESSION_SECONDS = 0.01
+
+
+# ======================================================
+# BENCHMARKS (хуудас бүрийн гол тооцоолол)
+# ======================================================
+def _page1_party_counts(codes):
+    codes = replace(codes)  # cached_property-гүй шинэ instance
+    np.bincount(codes.city_party_count, minlength=5)
+    np.bincount(codes.district_single_party, minlength=2)
+
+
+def _page2_heatmaps(codes):
+    codes = replace(codes)
+    party_mixing_matrix(codes.city_party_mask, codes.n_parties)
+    party_mixing_matrix(codes.district_party_mask, codes.n_parties)
+
+
+def _page3_pairs(codes):
+    pair_counts(codes.city_candidate, len(codes.city_candidate_labels))
+    pair_counts(codes.district_candidate, len(codes.district_candidate_labels))
+    cross_pair_counts(
+        codes.city_candidate, codes.district_candidate,
+        len(codes.city_candidate_labels), len(codes.district_candidate_labels),
+    )
+    _district_pair_keys(codes)
+
+
+def _page4_alignment(codes):
+    codes = replace(codes)
+    np.bincount(codes.city_district_aligned, minlength=2)
+    np.bincount(codes.seven_of_seven_same_party, minlength=2)
+
+
+def _page5_patterns(codes):
+    classify_party_patterns(codes.city_party)
+
+
+def _all_aggregates(codes):
+    compute_aggregates(replace(codes))
+
+
+def _cross_filter(codes):
+    codes = replace(codes)
+    index = build_bitmap_index(codes)
+    ballot_filter = BallotFilter(districts=tuple(index.values(DISTRICT)[:3]))
+    compute_aggregates(codes.take(index.rows(ballot_filter)))
+
+
+BENCHMARKS = {
+    "page1_party_counts": _page1_party_counts,
+    "page2_heatmaps": _page2_heatmaps,
+    "page3_pairs": _page3_pairs,
+    "page4_alignment": _page4_alignment,
+    "page5_patterns": _page5_patterns,
+    "all_aggregates": _all_aggregates,
+    "cross_filter": _cross_filter,
+}
+
+
+def _measure(func, *args, repeat=3):
+    """(хамгийн бага хугацаа секундээр, санах ойн оргил MB)."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args)
+        best = min(best, time.perf_counter() - start)
+
+    # Хугацааг tracemalloc-гүйгээр хэмжиж, оргилыг тусад нь нэг удаа
+    tracemalloc.start()
+    func(*args)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best, peak / 1024 ** 2
+
+
+def run_benchmarks(sizes, names=None, repeat=3, seed=0):
+    """Benchmark бүрийн үр дүнгийн жагсаалт (size, benchmark, seconds, ...)."""
+    names = names or list(BENCHMARKS)
+    results = []
+    for size in sizes:
+        n_ballots = SIZES[size]
+        df = to_compact_dtypes(generate_ballots(n_ballots, seed=seed))
+
+        seconds, peak_mb = _measure(encode_ballots, df, repeat=repeat)
+        codes = encode_ballots(df)
+        del df
+        timings = [("encode_ballots", seconds, peak_mb)]
+
+        for name in names:
+            seconds, peak_mb = _measure(BENCHMARKS[name], codes, repeat=repeat)
+            timings.append((name, seconds, peak_mb))
+
+        for name, seconds, peak_mb in timings:
+            results.append({
+                "size": size,
+                "n_ballots": n_ballots,
+                "benchmark": name,
+                "seconds": round(seconds, 6),
+                "peak_mb": round(peak_mb, 2),
+                "ballots_per_s": round(n_ballots / seconds) if seconds else None,
+            })
+            logger.info(
+                "%-5s %-20s %9.4fs %9.1f MB %14.0f ballots/s",
+                size, name, seconds, peak_mb, n_ballots / max(seconds, 1e-9),
+            )
+    return results
+
+
+def compare_results(current, baseline, threshold=REGRESSION_THRESHOLD,
+                    min_seconds=MIN_REGRESSION_SECONDS):
+    """Baseline-аас ``threshold``-оос илүү удааширсан хэмжилтүүд.
+
+    Хоёр хэмжилт хоёулаа ``min_seconds``-ээс богино бол алгасна.
+    """
+    base = {(r["size"], r["benchmark"]): r for r in baseline["results"]}
+    regressions = []
+    for r in current["results"]:
+        b = base.get((r["size"], r["benchmark"]))
+        if b is None or not b["seconds"]:
+            continue
+        if max(r["seconds"], b["seconds"]) < min_seconds:
+            continue
+        ratio = r["seconds"] / b["seconds"]
+        if ratio > 1 + threshold:
+            regressions.append({**r, "baseline_seconds": b["seconds"], "ratio": round(ratio, 3)})
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", nargs="+", default=["10k", "100k", "1M"], choices=list(SIZES))
+    parser.add_argument("--benchmarks", nargs="+", choices=list(BENCHMARKS))
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", default="bench_results.json")
+    parser.add_argument("--compare", metavar="BASELINE", help="baseline JSON файл")
+    parser.add_argument("--threshold", type=float, default=REGRESSION_THRESHOLD)
+    parser.add_argument(
+        "--min-seconds", type=float, default=MIN_REGRESSION_SECONDS,
+        help="хоёулаа үүнээс богино хэмжилтийг харьцуулахгүй",
+    )
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    # Baseline-ийг эхэлж уншина – --output ижил файл бол дарагдана
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+
+    current = {
+        "meta": {
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "pandas": pd.__version__,
+            "machine": platform.machine(),
+            "repeat": args.repeat,
+        },
+        "results": run_benchmarks(args.sizes, args.benchmarks, args.repeat),
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(current, f, indent=2)
+    logger.info("Results written to %s", args.output)
+
+    if baseline is not None:
+        regressions = compare_results(current, baseline, args.threshold, args.min_seconds)
+        for r in regressions:
+            logger.warning(
+                "REGRESSION %-5s %-20s %.4fs vs %.4fs (x%.2f)",
+                r["size"], r["benchmark"], r["seconds"], r["baseline_seconds"], r["ratio"],
+            )
+        if regressions:
+            sys.exit(1)
+        logger.info("No regressions against %s", args.compare)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+"""raw_data.csv-г хэсэгчлэн (chunk) уншиж цэвэрлээд ballot store болгон бичнэ.
+
+home.py-д тайлбарласан цэвэрлэгээний алхмууд chunk бүр дээр векторжсон
+байдлаар хийгдэнэ, chunk бүр тусдаа part болж бичигдэх тул олон GB
+түүхий файлыг тогтмол санах ойгоор боловсруулна.
+
+    python clean_pipeline.py raw_data.csv --chunksize 200000
+"""
+import argparse
+import logging
+import time
+from collections import defaultdict
+
+import pandas as pd
+
+from data_loader import (
+    CITY_CANDIDATE_COLS,
+    CITY_PARTY_COLS,
+    DISTRICT_CANDIDATE_COLS,
+    DISTRICT_PARTY_COLS,
+    RAW_CSV_PATH,
+    iter_raw_chunks,
+    to_compact_dtypes,
+    write_store,
+)
+from name_matcher import candidate_pool, load_candidate_index, resolve_names
+
+logger = logging.getLogger(__name__)
+
+NAME_COLS = CITY_CANDIDATE_COLS + DISTRICT_CANDIDATE_COLS
+PARTY_COLS = CITY_PARTY_COLS + DISTRICT_PARTY_COLS
+
+# OCR кирилл үсгийг ижил харагдах латин үсгээр андуурдаг
+_HOMOGLYPHS = str.maketrans("AaBEeKMHOoPpCcTXxy", "АаВЕеКМНОоРрСсТХху")
+
+
+def normalize_text(series):
+    return (
+        series.str.normalize("NFC")
+        .str.translate(_HOMOGLYPHS)
+        .str.replace(r"\s+", " ", regex=True)
+        .str.strip()
+    )
+
+
+# ======================================================
+# CLEANING STAGES
+# ======================================================
+def standardize_names(chunk, matcher):
+    for c in NAME_COLS + PARTY_COLS:
+        chunk[c] = normalize_text(chunk[c])
+    return chunk
+
+
+def extract_district_no(chunk, matcher):
+    chunk["district_no"] = pd.to_numeric(
+        chunk["district_no"].str.extract(r"(\d+)", expand=False)
+    )
+    return chunk
+
+
+def match_candidates(chunk, matcher):
+    # Дүүргийн нэр дэвшигчийг тухайн тойргийн жишиг нэрстэй тааруулж,
+    # олдсон бол жишиг нэр, намыг нь үнэн гэж үзнэ
+    index, executor = matcher
+    for cand_col, party_col in zip(DISTRICT_CANDIDATE_COLS, DISTRICT_PARTY_COLS):
+        matched = resolve_names(
+            index, chunk[cand_col], chunk["district_no"], executor=executor
+        )
+        matched.index = chunk.index
+        chunk[cand_col] = matched["candidate"].fillna(chunk[cand_col])
+        chunk[party_col] = matched["party"].fillna(chunk[party_col])
+    return chunk
+
+
+def drop_incomplete_city(chunk, matcher):
+    # 4 нэр дэвшигч дутуу хотын саналын хуудсыг хасна
+    return chunk.dropna(subset=CITY_CANDIDATE_COLS + CITY_PARTY_COLS)
+
+
+STAGES = [
+    ("standardize_names", standardize_names),
+    ("extract_district_no", extract_district_no),
+    # Хасагдах мөрүүдэд fuzzy matching хийхгүйн тулд match-аас өмнө
+    ("drop_incomplete_city", drop_incomplete_city),
+    ("match_candidates", match_candidates),
+]
+
+
+def clean_chunks(chunks, matcher, stats):
+    """Chunk бүрийг STAGES-ээр дамжуулж compact frame болгон гаргана."""
+    for chunk in chunks:
+        for name, stage in STAGES:
+            start = time.perf_counter()
+            rows_in = len(chunk)
+            chunk = stage(chunk, matcher)
+            stats[name]["rows_in"] += rows_in
+            stats[name]["rows_out"] += len(chunk)
+            stats[name]["seconds"] += time.perf_counter() - start
+        yield to_compact_dtypes(chunk)
+
+
+def run_pipeline(raw_path=RAW_CSV_PATH, chunksize=200_000, workers=None):
+    """Түүхий файлыг цэвэрлэж ballot store-ийг шинээр бичнэ.
+
+    Returns: алхам тус бүрийн {rows_in, rows_out, seconds}.
+    """
+    start = time.perf_counter()
+    stats = defaultdict(lambda: {"rows_in": 0, "rows_out": 0, "seconds": 0.0})
+
+    index = load_candidate_index()
+    with candidate_pool(index, workers) as executor:
+        n_rows = write_store(
+            clean_chunks(iter_raw_chunks(chunksize, raw_path), (index, executor), stats),
+            source="clean_pipeline",
+        )
+
+    for name, _ in STAGES:
+        s = stats[name]
+        logger.info(
+            "%-22s %10d -> %10d rows  %7.2fs",
+            name, s["rows_in"], s["rows_out"], s["seconds"],
+        )
+    logger.info(
+        "Cleaned store written: %d rows in %.2fs", n_rows, time.perf_counter() - start
+    )
+    return dict(stats)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("raw_path", nargs="?", default=RAW_CSV_PATH)
+    parser.add_argument("--chunksize", type=int, default=200_000)
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    run_pipeline(args.raw_path, args.chunksize, args.workers)
+
+
+if __name__ == "__main__":
+    main()
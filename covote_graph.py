@@ -0,0 +1,271 @@
+"""Нэр дэвшигчдийн хамт сонгогдолтын граф (хот + дүүрэг).
+
+Орой нь хотын болон дүүргийн нэр дэвшигчид, ирмэгийн жин нь нэг хуудсан
+дээр хамт сонгогдсон тоо. Граф нэгтгэлийн ``city_pairs``,
+``district_pairs``, ``cross_pairs`` матрицуудаас CSR хэлбэрээр үүснэ –
+саналын хуудсыг дахин уншихгүй. Нэр дэвшигч бүрийн top-k хамтрагч,
+Louvain аргаар (modularity) сонгогчдын блокуудыг илрүүлнэ.
+
+    python covote_graph.py --top 10
+"""
+import argparse
+import logging
+import time
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from aggregates import get_aggregates
+from analytics import candidate_party_labels
+from data_loader import dataset_cache
+
+logger = logging.getLogger(__name__)
+
+CITY, DISTRICT = "city", "district"
+
+
+@dataclass(frozen=True)
+class CoVoteGraph:
+    """Тэгш хэмтэй, жинтэй граф – CSR (indptr, indices, weights)."""
+
+    labels: np.ndarray        # оройн нэр
+    contests: np.ndarray      # "city" / "district"
+    parties: np.ndarray       # оройн намын нэр
+    indptr: np.ndarray
+    indices: np.ndarray
+    weights: np.ndarray
+
+    def __len__(self):
+        return len(self.labels)
+
+    @property
+    def n_edges(self):
+        return len(self.indices) // 2
+
+    def neighbors(self, node):
+        row = slice(self.indptr[node], self.indptr[node + 1])
+        return self.indices[row], self.weights[row]
+
+    def degrees(self):
+        return _degrees(self.indptr, self.weights)
+
+
+def _rows(indptr):
+    return np.repeat(np.arange(len(indptr) - 1), np.diff(indptr))
+
+
+def _degrees(indptr, weights):
+    return np.bincount(_rows(indptr), weights=weights, minlength=len(indptr) - 1)
+
+
+def _csr(matrix):
+    rows, cols = np.nonzero(matrix)
+    indptr = np.searchsorted(rows, np.arange(len(matrix) + 1))
+    return indptr, cols, matrix[rows, cols]
+
+
+def build_covote_graph(aggs):
+    """Нэгтгэлээс хот, дүүргийн бүх нэр дэвшигчийн граф."""
+    city, district, cross = aggs["city_pairs"], aggs["district_pairs"], aggs["cross_pairs"]
+    party_labels = aggs["party_labels"]
+    matrix = np.block([[city, cross], [cross.T, district]])
+    np.fill_diagonal(matrix, 0)
+
+    n_city, n_district = len(city), len(district)
+    indptr, indices, weights = _csr(matrix)
+    return CoVoteGraph(
+        labels=np.concatenate(
+            [aggs["city_candidate_labels"], aggs["district_candidate_labels"]]
+        ).astype(object),
+        contests=np.array([CITY] * n_city + [DISTRICT] * n_district, dtype=object),
+        parties=np.concatenate([
+            candidate_party_labels(party_labels, aggs["city_candidate_party"]),
+            candidate_party_labels(party_labels, aggs["district_candidate_party"]),
+        ]).astype(object),
+        indptr=indptr,
+        indices=indices,
+        weights=weights.astype(np.int64),
+    )
+
+
+# ======================================================
+# TOP-K ХАМТРАГЧ
+# ======================================================
+def node_index(graph, label, contest=None):
+    matches = np.flatnonzero(graph.labels == label)
+    if contest is not None:
+        matches = matches[graph.contests[matches] == contest]
+    if not len(matches):
+        raise KeyError(label)
+    return int(matches[0])
+
+
+def top_partners(graph, node, k=10, contest=None):
+    """Нэр дэвшигчтэй хамгийн их хамт сонгогдсон k нэр дэвшигч.
+
+    ``contest`` өгвөл зөвхөн тэр сонгуулийн хамтрагчид. ``share`` нь
+    оройн нийт ирмэгийн жинд эзлэх хувь.
+    """
+    partners, weights = graph.neighbors(node)
+    total = weights.sum()
+    if contest is not None:
+        keep = graph.contests[partners] == contest
+        partners, weights = partners[keep], weights[keep]
+    if k is not None and k < len(weights):
+        top = np.argpartition(-weights, k - 1)[:k]
+        partners, weights = partners[top], weights[top]
+    order = np.lexsort((partners, -weights))
+    partners, weights = partners[order], weights[order]
+    return pd.DataFrame({
+        "partner": graph.labels[partners],
+        "contest": graph.contests[partners],
+        "party": graph.parties[partners],
+        "count": weights,
+        "share": weights / total * 100 if total else np.zeros(len(weights)),
+    })
+
+
+# ======================================================
+# COMMUNITY DETECTION (Louvain)
+# ======================================================
+def _local_moving(indptr, indices, weights, resolution, rng):
+    """Нэг түвшний Louvain: орой бүрийг modularity өсгөх хөрш community руу зөөнө."""
+    n = len(indptr) - 1
+    degree = _degrees(indptr, weights)
+    m2 = degree.sum()
+    community = np.arange(n)
+    totals = degree.astype(np.float64)
+
+    moved = True
+    improved = False
+    while moved:
+        moved = False
+        for node in rng.permutation(n):
+            nbrs = indices[indptr[node]:indptr[node + 1]]
+            w = weights[indptr[node]:indptr[node + 1]]
+            not_self = nbrs != node
+            current = community[node]
+            totals[current] -= degree[node]
+
+            candidates, inverse = np.unique(
+                np.append(community[nbrs[not_self]], current), return_inverse=True
+            )
+            links = np.bincount(inverse[:-1], weights=w[not_self], minlength=len(candidates))
+            gain = links - resolution * totals[candidates] * degree[node] / m2
+            best = candidates[np.argmax(gain)]
+            if gain[np.argmax(gain)] <= gain[inverse[-1]]:
+                best = current
+
+            totals[best] += degree[node]
+            if best != current:
+                community[node] = best
+                moved = improved = True
+
+    _, community = np.unique(community, return_inverse=True)
+    return community, improved
+
+
+def _aggregate(indptr, indices, weights, community):
+    """Community бүрийг нэг орой болгосон граф (дотоод жин нь self-loop)."""
+    n = community.max() + 1
+    matrix = np.bincount(
+        community[_rows(indptr)] * n + community[indices], weights=weights, minlength=n * n
+    ).reshape(n, n)
+    return _csr(matrix)
+
+
+def detect_communities(graph, resolution=1.0, seed=0):
+    """Louvain аргаар орой бүрийн community-ийн дугаар (0..c-1)."""
+    rng = np.random.default_rng(seed)
+    indptr, indices, weights = graph.indptr, graph.indices, graph.weights.astype(np.float64)
+    membership = np.arange(len(graph))
+
+    if not len(weights):
+        return membership
+    while True:
+        community, improved = _local_moving(indptr, indices, weights, resolution, rng)
+        if not improved:
+            break
+        membership = community[membership]
+        indptr, indices, weights = _aggregate(indptr, indices, weights, community)
+    return membership
+
+
+def modularity(graph, communities, resolution=1.0):
+    rows = _rows(graph.indptr)
+    m2 = graph.weights.sum()
+    inside = graph.weights[communities[rows] == communities[graph.indices]].sum()
+    totals = np.bincount(communities, weights=graph.degrees())
+    return inside / m2 - resolution * ((totals / m2) ** 2).sum()
+
+
+COMMUNITY_COLUMNS = [
+    "community", "size", "city", "district", "parties",
+    "dominant_share", "cross_party", "top_members",
+]
+
+
+def community_table(graph, communities, top=5):
+    """Community бүрийн бүтэц: хэмжээ, намын найрлага, гол гишүүд.
+
+    ``cross_party`` нь нэгээс олон намын нэр дэвшигч нэг блокт орсон эсэх.
+    Ирмэггүй (шүүлтэд тохирох хуудсанд гараагүй) оройг алгасна.
+    """
+    degree = graph.degrees()
+    rows = []
+    for c in np.unique(communities[degree > 0]):
+        members = np.flatnonzero(communities == c)
+        parties = pd.Series(graph.parties[members]).value_counts()
+        leaders = members[np.argsort(-degree[members], kind="stable")[:top]]
+        rows.append({
+            "community": int(c),
+            "size": len(members),
+            "city": int((graph.contests[members] == CITY).sum()),
+            "district": int((graph.contests[members] == DISTRICT).sum()),
+            "parties": ", ".join(f"{p} {n}" for p, n in parties.items()),
+            "dominant_share": round(parties.iloc[0] / len(members) * 100, 1),
+            "cross_party": len(parties) > 1,
+            "top_members": ", ".join(graph.labels[leaders]),
+        })
+    table = pd.DataFrame(rows, columns=COMMUNITY_COLUMNS)
+    return table.sort_values("size", ascending=False, ignore_index=True)
+
+
+@dataset_cache(max_entries=8)
+def get_covote_graph(ballot_filter=None):
+    return build_covote_graph(get_aggregates(ballot_filter))
+
+
+@dataset_cache(max_entries=8)
+def get_communities(ballot_filter=None, resolution=1.0):
+    return detect_communities(get_covote_graph(ballot_filter), resolution)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--top", type=int, default=10, help="community бүрийн гол гишүүдийн тоо")
+    parser.add_argument("--resolution", type=float, default=1.0)
+    parser.add_argument("--output", help="community хүснэгтийг CSV-д бичих")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    aggs = get_aggregates()
+    start = time.perf_counter()
+    graph = build_covote_graph(aggs)
+    built = time.perf_counter()
+    communities = detect_communities(graph, args.resolution)
+    logger.info(
+        "Graph: %d nodes, %d edges in %.3fs; %d communities (Q=%.3f) in %.3fs",
+        len(graph), graph.n_edges, built - start,
+        communities.max() + 1, modularity(graph, communities, args.resolution),
+        time.perf_counter() - built,
+    )
+    table = community_table(graph, communities, args.top)
+    if args.output:
+        table.to_csv(args.output, index=False)
+    print(table.to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
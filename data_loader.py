@@ -1,22 +1,323 @@
-import streamlit as st
+import functools
+import hashlib
+import json
+import logging
+import os
+import shutil
+import time
+
 import pandas as pd
+import pyarrow.parquet as pq
+
+from memory_cache import memory_cached
+from page_timing import timed
+
+logger = logging.getLogger(__name__)
+
+CSV_PATH = "data/final_cleaned.csv"
+STORE_DIR = "data/ballot_store"
+STORE_BASE_PART = os.path.join(STORE_DIR, "part-00000.parquet")
+MANIFEST_NAME = "_manifest.json"
+# Manifest-д store-ийг юунаас бичсэнийг тэмдэглэнэ. Зөвхөн CSV-ээс
+# бичсэн, нэмэлт part-гүй store-ийг CSV-ээс дахин үүсгэж болно.
+SOURCE_KEY = "_source"
+CSV_SOURCE = "final_cleaned.csv"
+RAW_CSV_PATH = "raw_data.csv"
+CONTESTANTS_PATH = "data/contest_2_names_clean.csv"
+
+CITY_PARTY_COLS = ["party_1", "party_2", "party_3", "party_4"]
+CITY_CANDIDATE_COLS = ["choice_1", "choice_2", "choice_3", "choice_4"]
+DISTRICT_PARTY_COLS = ["district_party_1", "district_party_2"]
+DISTRICT_CANDIDATE_COLS = ["district_candidate_1", "district_candidate_2"]
+
+# Нэг бүлгийн багануудад ижил categories өгнө. Ингэснээр
+# party_1 == district_party_1 мэт харьцуулалт categorical дээр ажиллана.
+CATEGORY_GROUPS = [
+    CITY_PARTY_COLS + DISTRICT_PARTY_COLS,
+    CITY_CANDIDATE_COLS,
+    DISTRICT_CANDIDATE_COLS,
+]
+
+
+def _memory_mb(df):
+    return df.memory_usage(deep=True).sum() / 1024 ** 2
+
+
+def _observed_values(series):
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        return series.cat.remove_unused_categories().cat.categories
+    return series.dropna().unique()
+
+
+def to_compact_dtypes(df, group_categories=None):
+    """Party/candidate баганыг categorical, district_no-г жижиг int болгоно.
+
+    ``group_categories`` өгвөл CATEGORY_GROUPS бүрт тэр categories-ийг
+    ашиглана (шинэ batch-ийг байгаа store-ийн кодчлолоор кодлоход).
+    """
+    df = df.copy()
+
+    for i, cols in enumerate(CATEGORY_GROUPS):
+        present = [c for c in cols if c in df.columns]
+        if not present:
+            continue
+        if group_categories is not None:
+            categories = list(group_categories[i])
+        else:
+            categories = sorted(set().union(*(_observed_values(df[c]) for c in present)))
+        for c in present:
+            if isinstance(df[c].dtype, pd.CategoricalDtype):
+                df[c] = df[c].cat.set_categories(categories)
+            else:
+                df[c] = pd.Categorical(df[c], categories=categories)
+
+    # Үлдсэн текст баганууд (contest_city гэх мэт)
+    for c in df.columns:
+        if df[c].dtype == object or pd.api.types.is_string_dtype(df[c].dtype):
+            if not isinstance(df[c].dtype, pd.CategoricalDtype):
+                df[c] = df[c].astype("category")
+
+    if "district_no" in df.columns:
+        district_no = pd.to_numeric(df["district_no"], errors="coerce")
+        df["district_no"] = district_no.astype("UInt16")
+
+    return df
+
+
+_kept_stores = set()
+
+
+def _store_is_stale():
+    if not os.path.exists(STORE_BASE_PART):
+        return True
+    if not os.path.exists(CSV_PATH):
+        return False
+    if os.path.getmtime(CSV_PATH) <= os.path.getmtime(STORE_BASE_PART):
+        return False
+
+    # Ingest-ийн part-ууд болон pipeline/synth-ийн store CSV-д байхгүй –
+    # дахин үүсгэвэл устана. Хуучин manifest-д source байхгүй.
+    manifest = _read_manifest()
+    parts = sorted(name for name in manifest if name.endswith(".parquet"))
+    source = manifest.get(SOURCE_KEY, CSV_SOURCE)
+    if source == CSV_SOURCE and parts == [os.path.basename(STORE_BASE_PART)]:
+        return True
+    if STORE_DIR not in _kept_stores:
+        _kept_stores.add(STORE_DIR)
+        logger.error(
+            "%s is newer than the ballot store, but the store (source %s, %d parts) "
+            "holds data the CSV does not have; keeping the store. Remove %s to rebuild.",
+            CSV_PATH, source, len(parts), STORE_DIR,
+        )
+    return False
+
+
+def build_store():
+    """final_cleaned.csv-г Parquet store болгон хөрвүүлнэ."""
+    start = time.perf_counter()
+    raw = pd.read_csv(CSV_PATH)
+    read_s = time.perf_counter() - start
+
+    compact = to_compact_dtypes(raw)
+
+    write_store([compact], source=CSV_SOURCE)
+
+    logger.info(
+        "Ballot store rebuilt: %d rows, csv read %.2fs, total %.2fs, "
+        "memory %.1f MB -> %.1f MB",
+        len(compact),
+        read_s,
+        time.perf_counter() - start,
+        _memory_mb(raw),
+        _memory_mb(compact),
+    )
+    return compact
+
+
+def _store_parts():
+    return sorted(
+        os.path.join(STORE_DIR, name)
+        for name in os.listdir(STORE_DIR)
+        if name.endswith(".parquet")
+    )
+
+
+def _file_digest(path, chunk_size=1 << 20):
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _read_manifest(store_dir=STORE_DIR):
+    path = os.path.join(store_dir, MANIFEST_NAME)
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
 
-@st.cache_data(show_spinner=True)
+def _write_manifest(manifest, store_dir=STORE_DIR):
+    path = os.path.join(store_dir, MANIFEST_NAME)
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(path + ".tmp", path)
+
+
+def _write_part(df, path):
+    """Нэг part файл бичиж, түүний digest-ийг manifest-д нэмнэ."""
+    store_dir = os.path.dirname(path)
+    df.to_parquet(path, index=False)
+    manifest = _read_manifest(store_dir)
+    manifest[os.path.basename(path)] = {"rows": len(df), "digest": _file_digest(path)}
+    _write_manifest(manifest, store_dir)
+
+
+def write_store(frames, source):
+    """Frame-уудыг шинэ store болгон part тус бүрээр бичнэ.
+
+    ``frames`` нь iterator байж болно – нэг удаад нэг frame л санах ойд
+    байна. Бичиж дуусмагц хуучин store-ийг солино. ``source`` нь
+    manifest-д бичигдэнэ (``CSV_SOURCE`` бол CSV-ээс дахин үүсгэж болно).
+    """
+    tmp_dir = STORE_DIR + ".tmp"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+
+    n_rows = 0
+    for i, df in enumerate(frames):
+        _write_part(df, os.path.join(tmp_dir, f"part-{i:05d}.parquet"))
+        n_rows += len(df)
+
+    manifest = _read_manifest(tmp_dir)
+    manifest[SOURCE_KEY] = source
+    _write_manifest(manifest, tmp_dir)
+
+    _kept_stores.discard(STORE_DIR)
+    shutil.rmtree(STORE_DIR, ignore_errors=True)
+    os.replace(tmp_dir, STORE_DIR)
+    return n_rows
+
+
+def iter_store_frames():
+    """Store-ийн part бүрийг compact frame болгон нэг нэгээр нь уншина."""
+    if _store_is_stale():
+        build_store()
+    for path in _store_parts():
+        yield to_compact_dtypes(pd.read_parquet(path))
+
+
+def store_columns():
+    """Store-ийн баганын нэрс (base part-ын schema-аас)."""
+    return pq.read_schema(STORE_BASE_PART).names
+
+
+def append_to_store(df):
+    """Шинэ саналын хуудсуудыг store-д дараагийн part файл болгон нэмнэ."""
+    parts = _store_parts()
+    next_index = int(os.path.basename(parts[-1])[5:10]) + 1 if parts else 0
+    path = os.path.join(STORE_DIR, f"part-{next_index:05d}.parquet")
+    _write_part(df, path)
+    return path
+
+
+_fingerprint_memo = {}
+
+
+def _store_stamp():
+    manifest_path = os.path.join(STORE_DIR, MANIFEST_NAME)
+    mtime = os.stat(manifest_path).st_mtime_ns if os.path.exists(manifest_path) else None
+    return mtime, tuple(_store_parts())
+
+
+def dataset_fingerprint():
+    """Ballot store-ийн агуулгын hash. Cache-ийн түлхүүр болгон ашиглана.
+
+    Part бүрийн digest manifest-д хадгалагддаг тул зөвхөн manifest-д
+    байхгүй part-ыг уншиж hash-лана. Manifest болон part-уудын жагсаалт
+    өөрчлөгдөөгүй бол өмнөх утгыг шууд буцаана.
+    """
+    if _store_is_stale():
+        build_store()
+
+    stamp = _store_stamp()
+    if _fingerprint_memo.get("stamp") == stamp:
+        return _fingerprint_memo["fingerprint"]
+
+    manifest = _read_manifest()
+    digest = hashlib.blake2b(digest_size=16)
+    for path in stamp[1]:
+        name = os.path.basename(path)
+        entry = manifest.get(name) or {"digest": _file_digest(path)}
+        digest.update(name.encode())
+        digest.update(entry["digest"].encode())
+
+    _fingerprint_memo.update(stamp=stamp, fingerprint=digest.hexdigest())
+    return _fingerprint_memo["fingerprint"]
+
+
+def dataset_cache(phase="analytics", max_entries=None, show_spinner=False):
+    """Функцийг dataset fingerprint-ээр түлхүүрлэсэн memory cache болгоно.
+
+    DataFrame-ийг аргумент болгон hash-лахын оронд богино fingerprint
+    болон жижиг параметрүүдээр хайдаг тул хайлтын зардал саналын хуудсын
+    тооноос хамаарахгүй. Store өөрчлөгдвөл шинээр тооцоологдоно.
+    Fingerprint-ийн хугацаа "cache_hash", дуудлагынх ``phase`` үе шатад
+    (page_timing) бүртгэгдэнэ.
+
+        @dataset_cache(max_entries=1)
+        def get_ballot_codes():
+            return encode_ballots(load_data())
+    """
+    def decorator(func):
+        @memory_cached(f"{func.__module__}.{func.__qualname__}", max_entries, show_spinner)
+        def cached(dataset_version, *args, **kwargs):
+            return func(*args, **kwargs)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with timed("cache_hash"):
+                version = dataset_fingerprint()
+            with timed(phase):
+                return cached(version, *args, **kwargs)
+
+        wrapper.clear = cached.clear
+        return wrapper
+
+    return decorator
+
+
+@memory_cached(max_entries=1, show_spinner=True)
 def get_contestants_df():
     df = pd.read_csv(
-        "data/contest_2_names_clean.csv"
+        CONTESTANTS_PATH
     )
     return df
 
-@st.cache_data(show_spinner=True)
+@dataset_cache(phase="load_data", show_spinner=True, max_entries=1)
 def load_data():
+    """Ballot store-ийн frame. Процесс бүрт нэг л хувь, бүх session хуваалцана.
 
-    df = pd.read_csv('data/final_cleaned.csv')
-
+    Frame-ийг ЗӨВХӨН УНШИНА – багана нэмэх, өөрчлөх хэрэгтэй бол
+    ``.copy()`` хийнэ. Derived утгууд ``get_ballot_codes()``-д байна.
+    """
+    start = time.perf_counter()
+    df = to_compact_dtypes(pd.read_parquet(STORE_DIR))
+    logger.info(
+        "Ballot store loaded: %d rows in %.2fs, %.1f MB",
+        len(df),
+        time.perf_counter() - start,
+        _memory_mb(df),
+    )
     return df
 
-@st.cache_data(show_spinner=True)
+def iter_raw_chunks(chunksize=200_000, path=RAW_CSV_PATH):
+    """raw_data.csv-г chunksize мөрөөр хэсэгчлэн уншина (бүх багана текст)."""
+    return pd.read_csv(path, chunksize=chunksize, dtype=str)
+
+@memory_cached(max_entries=1, show_spinner=True)
 def get_raw_df():
 
-    df = pd.read_csv("raw_data.csv")
-    return df
\ No newline at end of file
+    df = pd.read_csv(RAW_CSV_PATH)
+    return df
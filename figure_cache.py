@@ -0,0 +1,43 @@
+"""Бэлэн Plotly figure-ийн процесс доторх LRU cache.
+
+Түлхүүр нь (хуудас, хэсэг, widget-ийн параметрүүд, sidebar шүүлт,
+dataset fingerprint). Figure-ууд memory_cache-ийн нийтлэг санах ойн
+төсөвт багтаж, нэмээд ``FIGURE_CACHE_SIZE``-аас олон болвол хамгийн
+хуучин нь гарна. Бүх session нэг cache хуваалцах ба figure-ийг pickle
+хийлгүй хадгалдаг тул давтан зочлоход figure-ийг дахин үүсгэх (px.*,
+update_layout) зардал гарахгүй. JSON serialization-ийг st.plotly_chart
+rerun бүрт хийсээр байна – "plotly_chart" үе шатаар хэмжигдэнэ.
+
+    @figure_cache("page1", "city_party_count")
+    def city_party_count_figure():
+        return px.bar(...)
+"""
+import functools
+
+from ballot_filters import active_filter
+from data_loader import dataset_fingerprint
+from memory_cache import get_memory_cache
+from page_timing import timed
+
+FIGURE_CACHE_SIZE = 128
+FIGURE_NAMESPACE = "figures"
+
+
+def figure_cache(page, section):
+    """Figure үүсгэгч функцийг (page, section, args, шүүлт, fingerprint)-ээр cache-лана.
+
+    Буцаасан figure-ийг бүх session хуваалцах тул дуудагч өөрчилж болохгүй.
+    """
+    def decorator(build):
+        @functools.wraps(build)
+        def wrapper(*params):
+            with timed("cache_hash"):
+                key = (page, section, params, active_filter(), dataset_fingerprint())
+            with timed("figure"):
+                return get_memory_cache().get_or_compute(
+                    FIGURE_NAMESPACE, key, lambda: build(*params), FIGURE_CACHE_SIZE
+                )
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,115 @@
+"""OCR-оор уншсан шинэ саналын хуудсын batch-ийг store-д нэмнэ.
+
+Batch-ийг шалгаж, store-д шинэ part болгон бичээд нэгтгэлүүдийг зөвхөн
+batch-ийн өөрчлөлтөөр (delta) шинэчилнэ. Зардал нь нийт саналын хуудсын
+тооноос биш batch-ийн хэмжээнээс хамаарна.
+
+    python ingest.py data/batch_0042.csv
+"""
+import argparse
+import logging
+import sys
+import time
+
+import pandas as pd
+
+from aggregates import (
+    build_aggregates,
+    compute_aggregates,
+    merge_aggregates,
+    read_aggregates,
+    save_aggregates,
+)
+from ballot_codes import encode_ballots
+from data_loader import (
+    CATEGORY_GROUPS,
+    CITY_CANDIDATE_COLS,
+    CITY_PARTY_COLS,
+    append_to_store,
+    dataset_fingerprint,
+    store_columns,
+    to_compact_dtypes,
+)
+
+logger = logging.getLogger(__name__)
+
+# CATEGORY_GROUPS-ийн дарааллаар нэгтгэлийн label хүснэгтүүд
+GROUP_LABEL_KEYS = ["party_labels", "city_candidate_labels", "district_candidate_labels"]
+
+
+def validate_batch(batch, aggs):
+    """Batch-ийг шалгаад store-ийн кодчлолтой compact frame болгоно.
+
+    Алдаатай batch-д ValueError шиднэ: багана дутуу, хотын сонголт дутуу,
+    эсвэл store-д байхгүй нам/нэр дэвшигч.
+    """
+    columns = store_columns()
+    missing_columns = [c for c in columns if c not in batch.columns]
+    if missing_columns:
+        raise ValueError(f"Batch is missing columns: {missing_columns}")
+    if batch.empty:
+        raise ValueError("Batch is empty.")
+
+    batch = batch[columns]
+
+    incomplete = batch[CITY_PARTY_COLS + CITY_CANDIDATE_COLS].isna().any(axis=1)
+    if incomplete.any():
+        raise ValueError(
+            f"{int(incomplete.sum())} ballots have fewer than 4 city choices."
+        )
+
+    district_no = pd.to_numeric(batch["district_no"], errors="coerce")
+    if (district_no.isna() & batch["district_no"].notna()).any():
+        raise ValueError("district_no contains non-numeric values.")
+
+    group_categories = [aggs[key] for key in GROUP_LABEL_KEYS]
+    for cols, labels in zip(CATEGORY_GROUPS, group_categories):
+        known = set(labels)
+        values = pd.unique(batch[cols].to_numpy().ravel())
+        unknown = [v for v in values if pd.notna(v) and v not in known]
+        if unknown:
+            raise ValueError(f"Unknown labels in {cols}: {unknown[:10]}")
+
+    return to_compact_dtypes(batch, group_categories=group_categories)
+
+
+def ingest_batch(batch):
+    """Batch-ийг store-д нэмж, шинэчлэгдсэн нэгтгэлийг буцаана."""
+    start = time.perf_counter()
+
+    base = read_aggregates(dataset_fingerprint())
+    if base is None:
+        base = build_aggregates()
+
+    compact = validate_batch(batch, base)
+    delta = compute_aggregates(encode_ballots(compact))
+    merged = merge_aggregates(base, delta)
+
+    # Store-д бичсэний дараа fingerprint өөрчлөгдөнө
+    append_to_store(compact)
+    save_aggregates(merged, dataset_fingerprint())
+
+    logger.info(
+        "Ingested %d ballots (total %d) in %.2fs",
+        len(compact),
+        int(merged["n_ballots"]),
+        time.perf_counter() - start,
+    )
+    return merged
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("batch", help="final_cleaned.csv схемтэй CSV файл")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    try:
+        ingest_batch(pd.read_csv(args.batch))
+    except ValueError as e:
+        logger.error("Batch rejected: %s", e)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,205 @@
+"""Санах ойн төсөвтэй (byte budget), процесс даяарх LRU cache.
+
+Frame, код, нэгтгэл, хосын хүснэгт, figure – бүх cache-лсэн утга нэг
+cache-д байж, entry бүрийн хэмжээг (байтаар) тооцно. Нийт хэмжээ
+``CACHE_BUDGET_MB``-аас хэтэрвэл хамгийн удаан хэрэглэгдээгүй entry-г
+гаргана. Namespace (ихэвчлэн нэг функц) бүрт ``max_entries`` хязгаар
+тавьж болно.
+
+    CACHE_BUDGET_MB=512 streamlit run app.py
+"""
+import dataclasses
+import functools
+import logging
+import os
+import sys
+import threading
+from collections import Counter, OrderedDict
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+logger = logging.getLogger(__name__)
+
+CACHE_BUDGET_MB = float(os.environ.get("CACHE_BUDGET_MB", 1024))
+
+
+def estimate_size(value):
+    """Утгын ойролцоо хэмжээ (байт). Figure-ийг JSON-ийн уртаар тооцно."""
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(deep=True).sum())
+    if isinstance(value, (pd.Series, pd.Index)):
+        return int(value.memory_usage(deep=True))
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, (str, bytes)):
+        return len(value)
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(
+            estimate_size(k) + estimate_size(v) for k, v in value.items()
+        )
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return sys.getsizeof(value) + sum(estimate_size(v) for v in value)
+    if hasattr(value, "to_plotly_json"):
+        return len(value.to_json())
+    if dataclasses.is_dataclass(value) or hasattr(value, "__dict__"):
+        # dataclass-ийн талбарууд болон cached_property утгууд __dict__-д бий
+        return sys.getsizeof(value) + estimate_size(vars(value))
+    return sys.getsizeof(value)
+
+
+@dataclasses.dataclass
+class _Entry:
+    value: object
+    size: int
+    namespace: str
+
+
+class MemoryCache:
+    """Thread-safe LRU. Нэг түлхүүрийг зэрэг тооцохгүй (session-ууд хүлээнэ)."""
+
+    def __init__(self, budget_bytes=int(CACHE_BUDGET_MB * 1024 ** 2)):
+        self.budget_bytes = budget_bytes
+        self.bytes = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._key_locks = {}
+        self.hits = Counter()
+        self.misses = Counter()
+        self.evictions = Counter()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get_or_compute(self, namespace, key, compute, max_entries=None):
+        """Cache-д байвал буцааж, үгүй бол ``compute()``-ийг нэг л удаа ажиллуулна."""
+        key = (namespace, key)
+        with self._lock:
+            entry = self._lookup(key)
+            if entry is not None:
+                return entry.value
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+
+        with key_lock:
+            # Өөр thread энэ хооронд тооцоолсон байж болно
+            with self._lock:
+                entry = self._lookup(key)
+                if entry is not None:
+                    return entry.value
+                self.misses[namespace] += 1
+            try:
+                value = compute()
+                self._insert(key, _Entry(value, estimate_size(value), namespace), max_entries)
+            finally:
+                with self._lock:
+                    self._key_locks.pop(key, None)
+        return value
+
+    def _lookup(self, key):
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+            self.hits[entry.namespace] += 1
+        return entry
+
+    def _insert(self, key, entry, max_entries):
+        if entry.size > self.budget_bytes:
+            logger.warning(
+                "%s: %.1f MB entry exceeds cache budget, not cached",
+                entry.namespace, entry.size / 1024 ** 2,
+            )
+            return
+        with self._lock:
+            self._entries[key] = entry
+            self.bytes += entry.size
+            if max_entries is not None:
+                same = [k for k, e in self._entries.items() if e.namespace == entry.namespace]
+                for old in same[:-max_entries]:
+                    self._evict(old)
+            while self.bytes > self.budget_bytes:
+                self._evict(next(iter(self._entries)))
+
+    def _evict(self, key):
+        entry = self._entries.pop(key)
+        self.bytes -= entry.size
+        self.evictions[entry.namespace] += 1
+        logger.info("Evicted %s (%.1f MB)", entry.namespace, entry.size / 1024 ** 2)
+
+    def clear(self, namespace=None):
+        with self._lock:
+            for key in [k for k, e in self._entries.items()
+                        if namespace is None or e.namespace == namespace]:
+                self.bytes -= self._entries.pop(key).size
+
+    def usage(self):
+        """Namespace бүрийн entry, MB болон hit/miss/eviction тоо."""
+        with self._lock:
+            sizes = Counter()
+            counts = Counter()
+            for entry in self._entries.values():
+                sizes[entry.namespace] += entry.size
+                counts[entry.namespace] += 1
+            namespaces = sorted(set(counts) | set(self.hits) | set(self.misses))
+            rows = [{
+                "namespace": ns,
+                "entries": counts[ns],
+                "mb": round(sizes[ns] / 1024 ** 2, 2),
+                "hits": self.hits[ns],
+                "misses": self.misses[ns],
+                "evictions": self.evictions[ns],
+            } for ns in namespaces]
+        return pd.DataFrame(
+            rows, columns=["namespace", "entries", "mb", "hits", "misses", "evictions"]
+        )
+
+
+@st.cache_resource
+def get_memory_cache():
+    return MemoryCache()
+
+
+def memory_cached(namespace=None, max_entries=None, show_spinner=False):
+    """Функцийн үр дүнг аргументаар нь memory cache-д хадгална.
+
+        @memory_cached(max_entries=1, show_spinner=True)
+        def get_contestants_df():
+            return pd.read_csv(CONTESTANTS_PATH)
+    """
+    def decorator(func):
+        ns = namespace or f"{func.__module__}.{func.__qualname__}"
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            key = (args, tuple(sorted(kwargs.items())))
+            return get_memory_cache().get_or_compute(
+                ns, key, _with_spinner(func, show_spinner, args, kwargs), max_entries
+            )
+
+        wrapper.clear = lambda: get_memory_cache().clear(ns)
+        return wrapper
+
+    return decorator
+
+
+def _with_spinner(func, show_spinner, args, kwargs):
+    def compute():
+        if not show_spinner:
+            return func(*args, **kwargs)
+        with st.spinner(f"Running {func.__name__}()"):
+            return func(*args, **kwargs)
+    return compute
+
+
+def render_cache_panel():
+    """Sidebar-ын admin самбар: cache-ийн хэмжээ, hit/miss/eviction."""
+    cache = get_memory_cache()
+    with st.expander("🧠 Cache санах ой"):
+        st.metric(
+            "Ашиглалт",
+            f"{cache.bytes / 1024 ** 2:.1f} / {cache.budget_bytes / 1024 ** 2:.0f} MB",
+        )
+        st.dataframe(cache.usage(), hide_index=True, use_container_width=True)
+        if st.button("Cache цэвэрлэх", key="memory_cache_clear"):
+            cache.clear()
+            st.rerun()
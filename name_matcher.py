@@ -0,0 +1,160 @@
+"""OCR-оор уншсан нэр дэвшигчийн нэрийг жишиг нэрстэй тааруулна.
+
+Жишиг нэр бүрийн тэмдэгтийн 3-gram-аар inverted index үүсгэж, асуулгын
+нэртэй хуваалцсан n-gram-ын тоогоор (Dice оноо) хамгийн ойрыг сонгоно.
+Дүүргийн нэр дэвшигчийг зөвхөн тухайн тойргийн нэрсээс хайна.
+"""
+import os
+import unicodedata
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from data_loader import CONTESTANTS_PATH
+
+NGRAM = 3
+MIN_SCORE = 0.6
+
+
+def ngrams(name, n=NGRAM):
+    """Нэрийн давхардаагүй тэмдэгтийн n-gram-ууд (үгийн захыг зайгаар тэмдэглэнэ)."""
+    text = " " + " ".join(unicodedata.normalize("NFC", name).upper().split()) + " "
+    return {text[i:i + n] for i in range(len(text) - n + 1)}
+
+
+@dataclass(frozen=True)
+class CandidateIndex:
+    """Жишиг нэрсийн n-gram index.
+
+    ``postings[gram]`` нь тухайн n-gram агуулсан жишиг нэрсийн индекс,
+    ``district_rows[d]`` нь d тойргийн нэрсийн индекс.
+    """
+
+    candidates: np.ndarray
+    parties: np.ndarray
+    districts: np.ndarray
+    gram_counts: np.ndarray
+    postings: dict
+    district_rows: dict
+
+    def __len__(self):
+        return len(self.candidates)
+
+
+def build_candidate_index(reference):
+    """(district, party, candidate) хүснэгтээс CandidateIndex үүсгэнэ."""
+    candidates = reference["candidate"].astype(str).to_numpy(dtype=object)
+    grams = [ngrams(name) for name in candidates]
+
+    postings = {}
+    for i, name_grams in enumerate(grams):
+        for gram in name_grams:
+            postings.setdefault(gram, []).append(i)
+
+    districts = pd.to_numeric(reference["district"], errors="coerce").to_numpy()
+    district_rows = {
+        int(d): np.flatnonzero(districts == d)
+        for d in np.unique(districts[~np.isnan(districts)])
+    }
+
+    return CandidateIndex(
+        candidates=candidates,
+        parties=reference["party"].astype(str).to_numpy(dtype=object),
+        districts=districts,
+        gram_counts=np.array([len(g) for g in grams], dtype=np.int64),
+        postings={gram: np.array(ids, dtype=np.int64) for gram, ids in postings.items()},
+        district_rows=district_rows,
+    )
+
+
+def load_candidate_index(path=CONTESTANTS_PATH):
+    return build_candidate_index(pd.read_csv(path))
+
+
+def best_match(index, name, district=None):
+    """Нэг нэрийн хамгийн ойр жишиг нэр: (индекс, оноо). Олдохгүй бол (-1, 0.0)."""
+    query = ngrams(name)
+    hits = [index.postings[g] for g in query if g in index.postings]
+    if not hits:
+        return -1, 0.0
+
+    shared = np.bincount(np.concatenate(hits), minlength=len(index))
+    rows = index.district_rows.get(district)
+    if rows is None:
+        rows = np.arange(len(index))
+
+    scores = 2.0 * shared[rows] / (len(query) + index.gram_counts[rows])
+    best = int(np.argmax(scores))
+    return int(rows[best]), float(scores[best])
+
+
+# ======================================================
+# BATCH RESOLVE (PROCESS POOL)
+# ======================================================
+_worker_index = None
+
+
+def _init_worker(index):
+    global _worker_index
+    _worker_index = index
+
+
+def _match_batch(names, districts):
+    return [best_match(_worker_index, n, d) for n, d in zip(names, districts)]
+
+
+def resolve_names(index, names, districts=None, min_score=MIN_SCORE,
+                  executor=None, batch_size=5_000):
+    """Нэрсийг жишиг нэр дэвшигч, намтай нь тааруулна.
+
+    Давхардсан (нэр, тойрог) хосыг нэг л удаа тооцоолно. ``executor`` нь
+    ``candidate_pool(index)``-оос авсан pool байвал batch-уудыг процессуудад
+    тараана. ``min_score``-оос бага оноотой нэр candidate/party = NaN.
+
+    Returns: names-тэй ижил эрэмбэтэй (candidate, party, score) DataFrame.
+    """
+    names = pd.Series(names, dtype=object).reset_index(drop=True)
+    if districts is None:
+        districts = pd.Series(np.nan, index=names.index)
+    districts = pd.to_numeric(pd.Series(districts).reset_index(drop=True), errors="coerce")
+
+    keys = pd.DataFrame({"name": names, "district": districts})
+    valid = keys["name"].notna()
+    unique = keys[valid].drop_duplicates()
+    unique_names = unique["name"].tolist()
+    unique_districts = [None if pd.isna(d) else int(d) for d in unique["district"]]
+
+    batches = [
+        (unique_names[i:i + batch_size], unique_districts[i:i + batch_size])
+        for i in range(0, len(unique_names), batch_size)
+    ]
+    if executor is None:
+        _init_worker(index)
+        results = [_match_batch(*batch) for batch in batches]
+    else:
+        results = executor.map(_match_batch, *zip(*batches)) if batches else []
+
+    matches = [m for batch in results for m in batch]
+    ids = np.array([m[0] for m in matches], dtype=np.int64)
+    scores = np.array([m[1] for m in matches], dtype=np.float64)
+    accepted = (ids >= 0) & (scores >= min_score)
+
+    unique = unique.assign(
+        candidate=np.where(accepted, index.candidates[ids], None),
+        party=np.where(accepted, index.parties[ids], None),
+        score=scores,
+    )
+    return keys.merge(unique, on=["name", "district"], how="left")[
+        ["candidate", "party", "score"]
+    ]
+
+
+def candidate_pool(index, workers=None):
+    """Index-ийг процесс бүрт нэг удаа ачаалсан ProcessPoolExecutor."""
+    return ProcessPoolExecutor(
+        max_workers=workers or os.cpu_count(),
+        initializer=_init_worker,
+        initargs=(index,),
+    )
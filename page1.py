@@ -1,35 +1,21 @@
 import streamlit as st
 import pandas as pd
 import plotly.express as px
-from data_loader import load_data
+from aggregates import get_aggregates
+from ballot_filters import active_filter
+from reports import city_party_count_table, district_discipline_table
+from figure_cache import figure_cache
+from page_timing import plotly_chart
 
-df = load_data()
-
-# ===== Табууд =====
-tab1, tab2 = st.tabs([
-    "Хот – Намын тууштай сонголт",
-    "Дүүрэг – Намын тууштай сонголт",
-])
+aggs = get_aggregates(active_filter())
 
 # ======================================================
-# TAB 1: Хотын түвшний намын тууштай сонголт
+# FIGURES (хэсэг нээгдэх үед л үүсгэж, cache-д хадгална)
 # ======================================================
-with tab1:
-
-    st.markdown("### Сонгогчдын хотын түвшний намын тууштай сонголт")
-
-    city_party_cols = ["party_1", "party_2", "party_3", "party_4"]
-
-    # 1. Саналын хуудас бүр дэх давхардаагүй намын тоо
-    city_unique_parties = df[city_party_cols].nunique(axis=1)
-
-    # 2. Нэгтгэсэн тоон үзүүлэлт
-    city_party_dist = (
-        city_unique_parties
-        .value_counts()
-        .sort_index()
-        .reset_index()
-    )
+@figure_cache("page1", "city_party_count")
+def city_party_count_figure():
+    # Саналын хуудас бүр дэх давхардаагүй намын тоо – нэгтгэсэн үзүүлэлт
+    city_party_dist = city_party_count_table(aggs)
 
     city_party_dist.columns = [
         "Сонгосон намын тоо",
@@ -81,69 +67,13 @@ with tab1:
         font=dict(family="Arial", size=14, color="#2c3e50"),
         height=550 # Fixed height for better control in Streamlit
     )
+    return fig
 
-    st.plotly_chart(fig, use_container_width=True)
-
-    st.markdown("""
-    ## Шинжилгээ 1: Хотын түвшний намын тууштай сонголт
-
-    ### Зорилго
-    Энэхүү шинжилгээ нь хотын төлөөлөгчдийг сонгох явцад сонгогчид **намын тууштай сонголтыг баримталж**, нэг намын нэр дэвшигчдийг тууштай сонгож байна уу, эсвэл **өөр өөр намуудын нэр дэвшигчдийг хольж** сонгож байна уу гэдгийг тодорхойлох зорилготой.
-
-    ---
-
-    ### Аргачлал
-    Саналын хуудас бүрд хотын сонгуульд сонгогдсон дөрвөн нэр дэвшигчийн дунд хэдэн **давхардаагүй улс төрийн нам** байгааг тооцоолсон.
-
-    Үзүүлэлт нь **1-ээс 4** хүртэлх утгатай байна:
-
-    - **1 нам:** Сонгогч бүх төлөөлөгчөө нэг намын хүрээнд сонгосон.
-    - **2–4 нам:** Сонгогч өөр өөр намуудын нэр дэвшигчдийг хольж сонгосон.
-
-    ---
 
-    ### Үр дүн
-
-    | Сонгосон намын тоо | Саналын хуудасны эзлэх хувь (%) |
-    |------------------:|--------------------------------:|
-    | 1 нам | **68.76%** |
-    | 2 нам | 15.96% |
-    | 3 нам | 9.52% |
-    | 4 нам | 5.77% |
-
-    ---
-
-    ### Тайлбар
-    Үр дүнгээс харахад хотын сонгуульд **намын тууштай сонголт харьцангуй өндөр** байна:
-
-    - **Арван сонгогч тутмын долоо орчим нь (68.76%)** дөрвөн төлөөлөгчөө бүгдийг нь **нэг намаас** сонгосон байна.
-    - 2–4 намтай саналын хувь багасч байгаа нь **хэт задгай сонголт харьцангуй бага** байгааг илтгэнэ.
-
-    ---
-
-    ### Гол дүгнэлт
-    Хотын төлөөлөгчдийг сонгох сонгогчдын зан төлөв **гол төлөв намаар тодорхойлогдож** байгаа ч нэг хэвийн биш байна. 
-    """)
-
-# ======================================================
-# TAB 2: Дүүргийн түвшний намын тууштай сонголт
-# ======================================================
-with tab2:
-
-    st.markdown("### Сонгогчдын дүүргийн түвшний намын тууштай сонголт")
-
-    # 1. Дүүргийн намын тууштай сонголт
-    district_party_discipline = (
-        df["district_party_1"] == df["district_party_2"]
-    )
-
-    # 2. Нэгтгэсэн тоон үзүүлэлт
-    district_discipline_dist = (
-        district_party_discipline
-        .value_counts()
-        .rename(index={True: "Нэг нам", False: "Холимог намууд"})
-        .reset_index()
-    )
+@figure_cache("page1", "district_discipline")
+def district_discipline_figure():
+    # Дүүргийн намын тууштай сонголт – нэгтгэсэн үзүүлэлт
+    district_discipline_dist = district_discipline_table(aggs)
 
     district_discipline_dist.columns = [
         "Дүүргийн сонголтын хэв шинж",
@@ -199,9 +129,75 @@ with tab2:
             )
         ]
     )
+    return fig
+
+
+# ===== Табууд =====
+tab1, tab2 = st.tabs([
+    "Хот – Намын тууштай сонголт",
+    "Дүүрэг – Намын тууштай сонголт",
+], key="page1_tabs", on_change="rerun")
+
+# ======================================================
+# TAB 1: Хотын түвшний намын тууштай сонголт
+# ======================================================
+with tab1:
+
+    st.markdown("### Сонгогчдын хотын түвшний намын тууштай сонголт")
+
+    if tab1.open:
+        plotly_chart(city_party_count_figure(), use_container_width=True)
+
+    st.markdown("""
+    ## Шинжилгээ 1: Хотын түвшний намын тууштай сонголт
+
+    ### Зорилго
+    Энэхүү шинжилгээ нь хотын төлөөлөгчдийг сонгох явцад сонгогчид **намын тууштай сонголтыг баримталж**, нэг намын нэр дэвшигчдийг тууштай сонгож байна уу, эсвэл **өөр өөр намуудын нэр дэвшигчдийг хольж** сонгож байна уу гэдгийг тодорхойлох зорилготой.
+
+    ---
+
+    ### Аргачлал
+    Саналын хуудас бүрд хотын сонгуульд сонгогдсон дөрвөн нэр дэвшигчийн дунд хэдэн **давхардаагүй улс төрийн нам** байгааг тооцоолсон.
+
+    Үзүүлэлт нь **1-ээс 4** хүртэлх утгатай байна:
+
+    - **1 нам:** Сонгогч бүх төлөөлөгчөө нэг намын хүрээнд сонгосон.
+    - **2–4 нам:** Сонгогч өөр өөр намуудын нэр дэвшигчдийг хольж сонгосон.
 
+    ---
+
+    ### Үр дүн
+
+    | Сонгосон намын тоо | Саналын хуудасны эзлэх хувь (%) |
+    |------------------:|--------------------------------:|
+    | 1 нам | **68.76%** |
+    | 2 нам | 15.96% |
+    | 3 нам | 9.52% |
+    | 4 нам | 5.77% |
+
+    ---
+
+    ### Тайлбар
+    Үр дүнгээс харахад хотын сонгуульд **намын тууштай сонголт харьцангуй өндөр** байна:
+
+    - **Арван сонгогч тутмын долоо орчим нь (68.76%)** дөрвөн төлөөлөгчөө бүгдийг нь **нэг намаас** сонгосон байна.
+    - 2–4 намтай саналын хувь багасч байгаа нь **хэт задгай сонголт харьцангуй бага** байгааг илтгэнэ.
+
+    ---
+
+    ### Гол дүгнэлт
+    Хотын төлөөлөгчдийг сонгох сонгогчдын зан төлөв **гол төлөв намаар тодорхойлогдож** байгаа ч нэг хэвийн биш байна. 
+    """)
+
+# ======================================================
+# TAB 2: Дүүргийн түвшний намын тууштай сонголт
+# ======================================================
+with tab2:
+
+    st.markdown("### Сонгогчдын дүүргийн түвшний намын тууштай сонголт")
 
-    st.plotly_chart(fig, use_container_width=True)
+    if tab2.open:
+        plotly_chart(district_discipline_figure(), use_container_width=True)
 
     st.markdown("""
     ## Шинжилгээ 2: Дүүргийн түвшний намын тууштай сонголт
@@ -1,28 +1,28 @@
 import streamlit as st
 import pandas as pd
+import numpy as np
 import plotly.express as px
-from itertools import combinations
-from collections import Counter
-from data_loader import load_data, get_contestants_df
+from data_loader import get_contestants_df
+from figure_cache import figure_cache
+from page_timing import EMPTY_SECTION_MESSAGE, page_run, plotly_chart
+from aggregates import get_aggregates, get_district_pair_tables
+from ballot_filters import active_filter
+from covote_graph import community_table, get_communities, get_covote_graph, top_partners
+from analytics import candidate_party_labels
+from reports import (
+    city_candidate_party_map, city_pair_table, district_deep_dive_table,
+    district_pair_table,
+)
 
 
 # ======================================================
 # DATA LOADING (CACHED)
 # ======================================================
-@st.cache_data(show_spinner=True)
-def get_df():
-    return load_data()
-
-@st.cache_data(show_spinner=False)
-def get_candidate_party_map(df):
-    m = {}
-    for i in range(1, 5):
-        m.update(dict(zip(df[f"choice_{i}"], df[f"party_{i}"])))
-    return m
-
-df = get_df()
+ballot_filter = active_filter()
+aggs = get_aggregates(ballot_filter)
+district_pair_tables = get_district_pair_tables(ballot_filter)
 district_candidate_df = get_contestants_df()
-candidate_party_map = get_candidate_party_map(df)
+candidate_party_map = city_candidate_party_map(aggs)
 
 # ======================================================
 # VECTORISED FORMATTING
@@ -30,35 +30,12 @@ candidate_party_map = get_candidate_party_map(df)
 def last_name(series: pd.Series):
     return series.str.split().str[-1]
 
-df["district_candidate_1_with_party"] = (
-    last_name(df["district_candidate_1"]) + " [" + df["district_party_1"] + "]"
-)
-
-df["district_candidate_2_with_party"] = (
-    last_name(df["district_candidate_2"]) + " [" + df["district_party_2"] + "]"
-)
-
-# ======================================================
-# CITY CO-VOTE PAIRS (ONCE)
-# ======================================================
-@st.cache_data(show_spinner=True)
-def compute_city_pairs(df):
-    cols = ["choice_1", "choice_2", "choice_3", "choice_4"]
-    counter = Counter()
-
-    for row in df[cols].itertuples(index=False):
-        cands = sorted(set(row))
-        counter.update(combinations(cands, 2))
-
-    return (
-        pd.DataFrame(
-            [(a, b, c) for (a, b), c in counter.items()],
-            columns=["candidate_a", "candidate_b", "count"],
-        )
-        .sort_values("count", ascending=False)
-    )
-
-co_vote_df = compute_city_pairs(df)
+district_candidate_with_party = (
+    last_name(pd.Series(aggs["district_candidate_labels"], dtype=object))
+    + " ["
+    + candidate_party_labels(aggs["party_labels"], aggs["district_candidate_party"])
+    + "]"
+).to_numpy()
 
 def format_candidate(name):
     if pd.isna(name):
@@ -68,64 +45,23 @@ def format_candidate(name):
     return f"{ln} ({party})"
 
 # ======================================================
-# DISTRICT PAIRS (ONCE)
-# ======================================================
-@st.cache_data(show_spinner=True)
-def compute_district_pairs(df):
-    counter = Counter()
-    for a, b in zip(
-        df["district_candidate_1_with_party"],
-        df["district_candidate_2_with_party"],
-    ):
-        counter[tuple(sorted((a, b)))] += 1
-
-    return (
-        pd.DataFrame(
-            [(a, b, c) for (a, b), c in counter.items()],
-            columns=["candidate_a", "candidate_b", "count"],
-        )
-        .sort_values("count", ascending=False)
-    )
-
-district_pair_df = compute_district_pairs(df)
-
-# ======================================================
-# TABS
+# FIGURES (хэсэг нээгдэх үед л үүсгэж, cache-д хадгална)
 # ======================================================
-tab1, tab2, tab3 = st.tabs(
-    [
-        "Хот: Хамт сонгогдсон хослол",
-        "Дүүрэг: Хамт сонгогдсон хослол",
-        "Дүүргийн түвшний шинжилгээ",
-    ]
-)
-
-# ======================================================
-# TAB 1 — CITY ANALYSIS
-# ======================================================
-with tab1:
-    st.markdown("""
-    ### Зорилго
-    Хотын сонгуульд сонгогчид **ямар нэр дэвшигчдийг хамтад нь сонгож байгааг** илрүүлэх.
-
-    ---
-    ### Аргачлал
-    - Саналын хуудас бүр дээр сонгогдсон **4 нэр дэвшигчээс**
-      бүх боломжит хослолыг (pair) үүсгэв
-    - Хос бүрийн **давтамжийг нэгтгэн** тооцоолсон
-    """)
-
-    top_pairs = co_vote_df.head(15).copy()
-    top_pairs["pair_label"] = (
+@figure_cache("page3", "city_pairs")
+def city_pairs_figure():
+    top_city_pairs = city_pair_table(aggs, k=15)
+    if top_city_pairs.empty:
+        return None
+    top_city_pairs["pair_label"] = (
         "<b>"
-        + top_pairs["candidate_a"].map(format_candidate)
+        + top_city_pairs["candidate_a"].map(format_candidate)
         + "</b> + <b>"
-        + top_pairs["candidate_b"].map(format_candidate)
+        + top_city_pairs["candidate_b"].map(format_candidate)
         + "</b>"
     )
 
     fig = px.bar(
-        top_pairs,
+        top_city_pairs,
         x="count",
         y="pair_label",
         orientation="h",
@@ -142,35 +78,22 @@ with tab1:
         coloraxis_showscale=False,
         yaxis=dict(categoryorder="total ascending"),
     )
+    return fig
 
-    st.plotly_chart(fig, use_container_width=True)
 
-    st.markdown("""
-    ---
-    ### Гол ажиглалт
-    - Хамт сонгогдож буй хослолууд нь **намаар бүлэглэн санал өгөх**
-      зан төлөв давамгай байгааг харуулж байна
-    - Зарим нэр дэвшигчид бусдаасаа илүү **тогтмол хамт сонгогдож** байна
-    """)
-
-# ======================================================
-# TAB 2 — DISTRICT OVERALL
-# ======================================================
-with tab2:
-    st.markdown("""
-    ### Зорилго
-    Дүүргийн сонгуульд **ямар хоёр нэр дэвшигч**
-    хамгийн олон удаа **хамт сонгогдсон** болохыг тодорхойлох.
-
-    """)
-
-    top_pairs = district_pair_df.head(15).copy()
-    top_pairs["pair_label"] = (
-        top_pairs["candidate_a"] + " + " + top_pairs["candidate_b"]
+@figure_cache("page3", "district_pairs")
+def district_pairs_figure():
+    top_district_pairs = district_pair_table(
+        aggs, district_candidate_with_party, k=15
+    )
+    if top_district_pairs.empty:
+        return None
+    top_district_pairs["pair_label"] = (
+        top_district_pairs["candidate_a"] + " + " + top_district_pairs["candidate_b"]
     )
 
     fig = px.bar(
-        top_pairs,
+        top_district_pairs,
         x="count",
         y="pair_label",
         orientation="h",
@@ -187,43 +110,18 @@ with tab2:
         coloraxis_showscale=False,
         yaxis=dict(categoryorder="total ascending"),
     )
+    return fig
 
-    st.plotly_chart(fig, use_container_width=True)
 
-# ======================================================
-# TAB 3 — SINGLE DISTRICT DEEP DIVE
-# ======================================================
-with tab3:
-    st.markdown("""
-    ### Зорилго
-    Сонгосон **нэг дүүргийн хүрээнд**
-    нэр дэвшигчдийн хамтын сонголтыг
-    **нарийвчлан задлан шинжлэх**.
-    """)
-
-    districts = sorted(df["district_no"].dropna().astype(int).unique())
-    selected = st.selectbox("Дүүрэг сонгох", districts)
-
-    ddf = df[df["district_no"] == selected]
-
-    pair_counts = (
-        ddf.groupby(
-            [
-                "district_candidate_1_with_party",
-                "district_candidate_2_with_party",
-            ]
-        )
-        .size()
-        .reset_index(name="count")
-        .sort_values("count", ascending=False)
+@figure_cache("page3", "district_deep_dive")
+def district_deep_dive_figure(selected):
+    pair_counts = district_deep_dive_table(
+        district_pair_tables, selected, district_candidate_with_party
     )
-
+    if pair_counts.empty:
+        return None
     pair_counts["pair_label"] = (
-        "<b>"
-        + pair_counts["district_candidate_1_with_party"]
-        + "</b> + <b>"
-        + pair_counts["district_candidate_2_with_party"]
-        + "</b>"
+        "<b>" + pair_counts["candidate_a"] + "</b> + <b>" + pair_counts["candidate_b"] + "</b>"
     )
 
     fig = px.bar(
@@ -244,12 +142,181 @@ with tab3:
         coloraxis_showscale=False,
         yaxis=dict(categoryorder="total ascending"),
     )
+    return fig
+
+
+@figure_cache("page3", "candidate_partners")
+def candidate_partners_figure(node):
+    covote_graph = get_covote_graph(ballot_filter)
+    partners = top_partners(covote_graph, node, k=15)
+    if partners.empty:
+        return None
+    partners["partner_label"] = (
+        "<b>" + partners["partner"] + "</b> (" + partners["party"] + ")"
+    )
+    partners["contest"] = partners["contest"].map({"city": "Хот", "district": "Дүүрэг"})
 
-    st.plotly_chart(fig, use_container_width=True)
+    fig = px.bar(
+        partners,
+        x="count",
+        y="partner_label",
+        orientation="h",
+        text="count",
+        color="contest",
+        title=f"<b>{covote_graph.labels[node]}: Хамгийн их хамт сонгогдсон 15 нэр дэвшигч</b>",
+        template="plotly_white",
+        color_discrete_map={"Хот": "#2980b9", "Дүүрэг": "#27ae60"},
+        labels={"contest": "Сонгууль"},
+    )
+
+    fig.update_layout(
+        height=600,
+        yaxis=dict(categoryorder="total ascending", title=None),
+        xaxis_title="Хамт сонгогдсон тоо",
+    )
+    return fig
+
+
+# ======================================================
+# TAB 3 FRAGMENT – дүүрэг солиход зөвхөн энэ хэсэг дахин ажиллана
+# ======================================================
+@st.fragment
+def district_deep_dive():
+    # Fragment-ийн дахин ажиллалт app.py-ийн page_run-аас гадуур явна
+    with page_run("CANDIDATE BEHAVIOR: district deep dive"):
+        if not district_pair_tables:
+            st.info(EMPTY_SECTION_MESSAGE)
+            return
+        selected = st.selectbox("Дүүрэг сонгох", list(district_pair_tables), key="page3_district")
+
+        if tab3.open:
+            plotly_chart(district_deep_dive_figure(selected), use_container_width=True)
+
+        st.markdown(f"""
+        ---
+        ### Тайлбар ({selected}-р тойрог)
+        - Энэ дүүрэгт сонгогчид **ямар хоёр нэр дэвшигчийг**
+          хамтад нь сонгосныг харуулна
+        """)
+
+# ======================================================
+# TAB 4 FRAGMENT – нэр дэвшигч солиход зөвхөн энэ хэсэг дахин ажиллана
+# ======================================================
+@st.fragment
+def candidate_network():
+    # Граф нь зөвхөн tab нээгдэхэд үүснэ
+    if not tab4.open:
+        return
+    with page_run("CANDIDATE BEHAVIOR: candidate network"):
+        covote_graph = get_covote_graph(ballot_filter)
+        connected = np.flatnonzero(covote_graph.degrees() > 0)
+        if not len(connected):
+            st.info(EMPTY_SECTION_MESSAGE)
+            return
+        node = st.selectbox(
+            "Нэр дэвшигч сонгох",
+            connected,
+            format_func=lambda i: f"{covote_graph.labels[i]} ({covote_graph.parties[i]})",
+        )
+        plotly_chart(candidate_partners_figure(node), use_container_width=True)
+
+
+# ======================================================
+# TABS
+# ======================================================
+tab1, tab2, tab3, tab4 = st.tabs(
+    [
+        "Хот: Хамт сонгогдсон хослол",
+        "Дүүрэг: Хамт сонгогдсон хослол",
+        "Дүүргийн түвшний шинжилгээ",
+        "Нэр дэвшигчдийн сүлжээ",
+    ],
+    key="page3_tabs",
+    on_change="rerun",
+)
+
+# ======================================================
+# TAB 1 — CITY ANALYSIS
+# ======================================================
+with tab1:
+    st.markdown("""
+    ### Зорилго
+    Хотын сонгуульд сонгогчид **ямар нэр дэвшигчдийг хамтад нь сонгож байгааг** илрүүлэх.
+
+    ---
+    ### Аргачлал
+    - Саналын хуудас бүр дээр сонгогдсон **4 нэр дэвшигчээс**
+      бүх боломжит хослолыг (pair) үүсгэв
+    - Хос бүрийн **давтамжийг нэгтгэн** тооцоолсон
+    """)
+
+    if tab1.open:
+        plotly_chart(city_pairs_figure(), use_container_width=True)
+
+    st.markdown("""
+    ---
+    ### Гол ажиглалт
+    - Хамт сонгогдож буй хослолууд нь **намаар бүлэглэн санал өгөх**
+      зан төлөв давамгай байгааг харуулж байна
+    - Зарим нэр дэвшигчид бусдаасаа илүү **тогтмол хамт сонгогдож** байна
+    """)
+
+# ======================================================
+# TAB 2 — DISTRICT OVERALL
+# ======================================================
+with tab2:
+    st.markdown("""
+    ### Зорилго
+    Дүүргийн сонгуульд **ямар хоёр нэр дэвшигч**
+    хамгийн олон удаа **хамт сонгогдсон** болохыг тодорхойлох.
+
+    """)
+
+    if tab2.open:
+        plotly_chart(district_pairs_figure(), use_container_width=True)
+
+# ======================================================
+# TAB 3 — SINGLE DISTRICT DEEP DIVE
+# ======================================================
+with tab3:
+    st.markdown("""
+    ### Зорилго
+    Сонгосон **нэг дүүргийн хүрээнд**
+    нэр дэвшигчдийн хамтын сонголтыг
+    **нарийвчлан задлан шинжлэх**.
+    """)
+
+    district_deep_dive()
+
+# ======================================================
+# TAB 4 — CANDIDATE CO-VOTE NETWORK
+# ======================================================
+with tab4:
+    st.markdown("""
+    ### Зорилго
+    Хот болон дүүргийн **бүх нэр дэвшигчийг нэг сүлжээ** болгож,
+    нэг саналын хуудсан дээр хамт сонгогдсон тоогоор холбоог жигнэв.
 
-    st.markdown(f"""
     ---
-    ### Тайлбар ({selected}-р тойрог)
-    - Энэ дүүрэгт сонгогчид **ямар хоёр нэр дэвшигчийг**
-      хамтад нь сонгосныг харуулна
+    ### Аргачлал
+    - Нэр дэвшигч бүрийн **хамгийн ойр хамтрагчид** (хот, дүүрэг хоёулаа)
+    - **Louvain** аргаар (modularity) хоорондоо нягт холбогдсон
+      **сонгогчдын блок**-уудыг илрүүлэв – нэг блокт өөр өөр намын
+      нэр дэвшигч орсон бол намын хил давсан санал өгөлтийг илтгэнэ
     """)
+
+    candidate_network()
+
+    if tab4.open:
+        st.subheader("Сонгогчдын блокууд (community)")
+        blocs = community_table(
+            get_covote_graph(ballot_filter), get_communities(ballot_filter)
+        )
+        blocs.columns = [
+            "Блок", "Нэр дэвшигчид", "Хот", "Дүүрэг", "Намын найрлага",
+            "Давамгай намын хувь (%)", "Олон намтай", "Гол гишүүд",
+        ]
+        if blocs.empty:
+            st.info(EMPTY_SECTION_MESSAGE)
+        else:
+            st.dataframe(blocs, hide_index=True, use_container_width=True)
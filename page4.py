@@ -1,33 +1,24 @@
 import streamlit as st
 import pandas as pd
 import plotly.express as px
-from data_loader import load_data
+from aggregates import get_aggregates
+from ballot_filters import active_filter
+from reports import alignment_table, loyal_party_table, loyalty_table
+from figure_cache import figure_cache
+from page_timing import plotly_chart
 
-df = load_data()
+aggs = get_aggregates(active_filter())
 
 # ======================================================
-# Хот – Дүүргийн намын уялдаа холбоо
+# FIGURES (хэсэг нээгдэх үед л үүсгэж, cache-д хадгална)
 # ======================================================
-tab1,tab2 = st.tabs(['Хот – Дүүргийн намын уялдаа холбоо', 'Нэг намд 6/6 санал өгсөн сонгогчид'])
-
-with tab1:
-    city_party_cols = ["party_1", "party_2", "party_3", "party_4"]
-
-    # Дүүргийн намыг эхний нэр дэвшигчийн намаар тодорхойлох
-    district_party = df["district_party_1"]
-
-    # Хотын сонголт дүүргийн намтай давхцаж байгаа эсэх
-    city_district_alignment = df[city_party_cols].eq(
-        district_party, axis=0
-    ).any(axis=1)
-
-    # Нэгтгэсэн үзүүлэлт
-    alignment_dist = (
-        city_district_alignment
-        .value_counts()
-        .rename(index={True: "Уялдсан", False: "Уялдаагүй"})
-        .reset_index()
-    )
+@figure_cache("page4", "alignment")
+def alignment_figure():
+    # Дүүргийн намыг эхний нэр дэвшигчийн намаар тодорхойлж,
+    # хотын сонголт түүнтэй давхцсан эсэхийн нэгтгэсэн үзүүлэлт
+    alignment_dist = alignment_table(aggs)
+    if alignment_dist.empty:
+        return None
 
     alignment_dist.columns = [
         "Хот–Дүүргийн намын уялдаа",
@@ -77,90 +68,20 @@ with tab1:
         yaxis=dict(range=[0, max_alignment * 1.25], showgrid=True, gridcolor='#f0f0f0'),
         font=dict(family="Arial", size=14)
     )
+    return fig
 
-    st.subheader('Сонгууль хоорондын намын уялдаа холбоо (Хот <-> Дүүрэг)')
-    st.plotly_chart(fig, use_container_width=True)
-
-    st.markdown("""
-
-        ### Зорилго
-        Энэхүү шинжилгээ нь сонгогчид нийслэл болон дүүргийн **сонгуулийн хооронд намын сонголтдоо хэр тууштай байгааг** судална. 
-
-        Өөрөөр хэлбэл:
-        > *Сонгогчид хотын сонгуульд дэмжсэн намаа дүүргийн сонгуульд үргэлжлүүлэн дэмжиж байна уу?*
-
-        ---
-
-        ### Аргачлал
-        Саналын хуудас бүрд:
-        - **Дүүргийн нам**-ыг дүүргийн эхний нэр дэвшигчийн намаар (`district_party_1`) тодорхойлов.
-        - Хэрэв хотын сонгуульд сонгосон дөрвөн нэр дэвшигчийн **дор хаяж нэг нь** дүүргийн сонголттой ижил намынх байвал тухайн саналын хуудсыг **"Уялдсан"** гэж үзнэ.
-        - Бусад тохиолдолд **"Уялдаагүй"** гэж үзнэ.
-
-        ---
-
-        ### Үр дүн
-
-        | Уялдааны төлөв | Саналын хуудасны эзлэх хувь (%) |
-        |----------------|--------------------------------:|
-        | Уялдсан | **85.81%** |
-        | Уялдаагүй | 14.19% |
-
-        ---
-
-        ### Тайлбар
-        Үр дүнгээс харахад **сонгууль хоорондын намын сонголт маш өндөр уялдаатай** байна:
-
-        - **Саналын хуудасны 85-аас илүү хувь** нь хот болон дүүргийн намын сонголт хоорондоо таарч байгаа нь сонгогчид намын чиг баримжаагаа сонгуулийн төрөл харгалзахгүй **тууштай хадгалж** байгааг харуулж байна.
-        - Зөвхөн **14.19%** тохиолдолд хот болон дүүргийн сонголтын хооронд намын зөрүү ажиглагдсан нь өөр өөр намыг хольж сонгох үзэгдэл харьцангуй ховор байгааг илтгэнэ.
-
-        ---
-
-        ### Гол дүгнэлт
-        Хотын сонгуульд нэр дэвшигчдийг хольж сонгох тохиолдол ажиглагддаг ч сонгогчид **сонгууль хооронд өндөр тууштай байдал** үзүүлж байна. 
-        Дүүргийн төлөөлөгчөө сонгохдоо ихэнх сонгогчид хотын сонгуулиар аль хэдийн дэмжсэн намынхаа хүнийг сонгож байна.
-
-        ---
-
-        """)
-
-with tab2:
-    # ======================================================
-    # TAB: Нэг намд 7/7 санал өгсөн сонгогчид
-    # ======================================================
-
-    city_party_cols = ["party_1", "party_2", "party_3", "party_4"]
-
-    # 1. Хотын сонгууль: зөвхөн 1 нам
-    df["city_single_party"] = df[city_party_cols].nunique(axis=1) == 1
-
-    # 2. Дүүргийн сонгууль: зөвхөн 1 нам (аль хэдийн 2 хүн)
-    df["district_single_party"] = df["district_party_1"] == df["district_party_2"]
-
-    # 3. Хот + Дүүрэг ижил нам
-    df["same_party_city_district"] = (
-        df[city_party_cols[0]] == df["district_party_1"]
-    )
-
-    # 4. БҮРЭН НАМЫН ТУУШТАЙ СОНГОЛТ (7/7)
-    df["seven_of_seven_same_party"] = (
-        df["city_single_party"]
-        & df["district_single_party"]
-        & df["same_party_city_district"]
-    )
 
+@figure_cache("page4", "loyalty")
+def loyalty_figure():
     # --------------------------------------------------
     # Aggregate
     # --------------------------------------------------
-    loyalty_dist = (
-        df["seven_of_seven_same_party"]
-        .value_counts()
-        .rename(index={True: "6/6 Нэг нам", False: "Бусад"})
-        .reset_index()
-    )
+    loyalty_dist = loyalty_table(aggs)
+    if loyalty_dist.empty:
+        return None
 
     loyalty_dist.columns = ["Саналын хэв шинж", "Саналын хуудасны тоо"]
-    
+
 
     total_votes = loyalty_dist["Саналын хуудасны тоо"].sum()
     max_votes = loyalty_dist["Саналын хуудасны тоо"].max()
@@ -212,24 +133,15 @@ with tab2:
             gridcolor="#f0f0f0"
         )
     )
-
-    st.subheader("Нэг намд үнэнч байдал (6/6)")
-    st.plotly_chart(fig, use_container_width=True)
+    return fig
 
 
-    # ======================================================
-    # Donut chart: Party share among 6/6 loyal voters
-    # ======================================================
-
-    # Filter only fully loyal ballots
-    loyal_df = df[df["seven_of_seven_same_party"]].copy()
-
+@figure_cache("page4", "loyal_party")
+def loyal_party_figure():
     # Party distribution (party_1 is enough — all are same)
-    party_dist = (
-        loyal_df["party_1"]
-        .value_counts()
-        .reset_index()
-    )
+    party_dist = loyal_party_table(aggs)
+    if party_dist.empty:
+        return None
 
     party_dist.columns = ["Нам", "Саналын хуудасны тоо"]
 
@@ -264,6 +176,77 @@ with tab2:
         legend_title_text="Нам",
         margin=dict(t=90, b=40, l=40, r=40)
     )
+    return fig_donut
+
+
+# ======================================================
+# Хот – Дүүргийн намын уялдаа холбоо
+# ======================================================
+tab1,tab2 = st.tabs(['Хот – Дүүргийн намын уялдаа холбоо', 'Нэг намд 6/6 санал өгсөн сонгогчид'], key="page4_tabs", on_change="rerun")
+
+with tab1:
+    st.subheader('Сонгууль хоорондын намын уялдаа холбоо (Хот <-> Дүүрэг)')
+    if tab1.open:
+        plotly_chart(alignment_figure(), use_container_width=True)
+
+    st.markdown("""
+
+        ### Зорилго
+        Энэхүү шинжилгээ нь сонгогчид нийслэл болон дүүргийн **сонгуулийн хооронд намын сонголтдоо хэр тууштай байгааг** судална. 
+
+        Өөрөөр хэлбэл:
+        > *Сонгогчид хотын сонгуульд дэмжсэн намаа дүүргийн сонгуульд үргэлжлүүлэн дэмжиж байна уу?*
+
+        ---
+
+        ### Аргачлал
+        Саналын хуудас бүрд:
+        - **Дүүргийн нам**-ыг дүүргийн эхний нэр дэвшигчийн намаар (`district_party_1`) тодорхойлов.
+        - Хэрэв хотын сонгуульд сонгосон дөрвөн нэр дэвшигчийн **дор хаяж нэг нь** дүүргийн сонголттой ижил намынх байвал тухайн саналын хуудсыг **"Уялдсан"** гэж үзнэ.
+        - Бусад тохиолдолд **"Уялдаагүй"** гэж үзнэ.
+
+        ---
+
+        ### Үр дүн
+
+        | Уялдааны төлөв | Саналын хуудасны эзлэх хувь (%) |
+        |----------------|--------------------------------:|
+        | Уялдсан | **85.81%** |
+        | Уялдаагүй | 14.19% |
+
+        ---
+
+        ### Тайлбар
+        Үр дүнгээс харахад **сонгууль хоорондын намын сонголт маш өндөр уялдаатай** байна:
+
+        - **Саналын хуудасны 85-аас илүү хувь** нь хот болон дүүргийн намын сонголт хоорондоо таарч байгаа нь сонгогчид намын чиг баримжаагаа сонгуулийн төрөл харгалзахгүй **тууштай хадгалж** байгааг харуулж байна.
+        - Зөвхөн **14.19%** тохиолдолд хот болон дүүргийн сонголтын хооронд намын зөрүү ажиглагдсан нь өөр өөр намыг хольж сонгох үзэгдэл харьцангуй ховор байгааг илтгэнэ.
+
+        ---
+
+        ### Гол дүгнэлт
+        Хотын сонгуульд нэр дэвшигчдийг хольж сонгох тохиолдол ажиглагддаг ч сонгогчид **сонгууль хооронд өндөр тууштай байдал** үзүүлж байна. 
+        Дүүргийн төлөөлөгчөө сонгохдоо ихэнх сонгогчид хотын сонгуулиар аль хэдийн дэмжсэн намынхаа хүнийг сонгож байна.
+
+        ---
+
+        """)
+
+with tab2:
+    # ======================================================
+    # TAB: Нэг намд 7/7 санал өгсөн сонгогчид
+    # ======================================================
+
+    # БҮРЭН НАМЫН ТУУШТАЙ СОНГОЛТ (7/7): хот 1 нам + дүүрэг 1 нам + ижил нам
+    st.subheader("Нэг намд үнэнч байдал (6/6)")
+    if tab2.open:
+        plotly_chart(loyalty_figure(), use_container_width=True)
+
+
+    # ======================================================
+    # Donut chart: Party share among 6/6 loyal voters
+    # ======================================================
 
     st.subheader("6/6 Намын тууштай санал: Намын эзлэх хувь")
-    st.plotly_chart(fig_donut, use_container_width=True)
\ No newline at end of file
+    if tab2.open:
+        plotly_chart(loyal_party_figure(), use_container_width=True)
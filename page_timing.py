@@ -0,0 +1,154 @@
+"""Хуудас бүрийн ажиллалтын хугацааг үе шатаар нь хэмжинэ.
+
+app.py хуудас бүрийг ``page_run``-аар ажиллуулна. Дотор нь ``timed(phase)``
+блокуудын өөрийн (self) хугацаа нэмэгдэж, ажиллалт дуусахад үе шат бүрийн
+нийлбэр процесс даяарх гүйдэг цонхонд (rolling window) орно. Хуудаснаас
+гадуур (CLI, export) ``timed`` юу ч хийхгүй. Fragment-ийн дахин ажиллалт
+app.py-г дайрахгүй тул fragment-ийн биеийг мөн ``page_run``-аар ороосон.
+
+    with page_run(pg.title):
+        pg.run()
+"""
+import contextvars
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+PHASES = ["load_data", "cache_hash", "analytics", "figure", "plotly_chart", "total"]
+TIMING_WINDOW = 500
+
+_current_run = contextvars.ContextVar("page_timing_run", default=None)
+
+
+class _Run:
+    """Нэг ажиллалтын үе шат бүрийн нийлбэр, идэвхтэй timed блокуудын стек."""
+
+    def __init__(self):
+        self.totals = defaultdict(float)
+        self.children = []   # идэвхтэй блок бүрийн дотоод timed-уудын хугацаа
+
+
+class TimingStore:
+    """(хуудас, үе шат) бүрийн сүүлийн ``window`` хэмжилт. Thread-safe."""
+
+    def __init__(self, window=TIMING_WINDOW):
+        self.window = window
+        self._samples = defaultdict(lambda: deque(maxlen=self.window))
+        self._lock = threading.Lock()
+
+    def add(self, page, phase, seconds):
+        with self._lock:
+            self._samples[page, phase].append(seconds)
+
+    def summary(self):
+        """Хуудас, үе шат бүрийн p50/p95 (ms)."""
+        with self._lock:
+            samples = {key: np.array(values) for key, values in self._samples.items()}
+
+        rows = []
+        for (page, phase), values in samples.items():
+            p50, p95 = np.percentile(values, [50, 95]) * 1000
+            rows.append({
+                "page": page,
+                "phase": phase,
+                "runs": len(values),
+                "p50_ms": round(p50, 1),
+                "p95_ms": round(p95, 1),
+            })
+        summary = pd.DataFrame(rows, columns=["page", "phase", "runs", "p50_ms", "p95_ms"])
+        order = summary["phase"].map({phase: i for i, phase in enumerate(PHASES)})
+        return (
+            summary.assign(order=order)
+            .sort_values(["page", "order"])
+            .drop(columns="order")
+            .reset_index(drop=True)
+        )
+
+    def clear(self):
+        with self._lock:
+            self._samples.clear()
+
+
+@st.cache_resource
+def get_timing_store():
+    return TimingStore()
+
+
+@contextmanager
+def timed(phase):
+    """Одоогийн хуудасны ажиллалтад ``phase``-ийн хугацааг нэмнэ.
+
+    dataset_cache-ууд бие биеэ дууддаг тул дотор нь орсон timed блокуудын
+    хугацааг хасна – үе шатууд давхцахгүй, нийлбэр нь total-аас хэтрэхгүй.
+    """
+    run = _current_run.get()
+    if run is None:
+        yield
+        return
+    run.children.append(0.0)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        run.totals[phase] += elapsed - run.children.pop()
+        if run.children:
+            run.children[-1] += elapsed
+
+
+@contextmanager
+def page_run(page):
+    """Нэг хуудасны ажиллалтыг хэмжиж, дуусахад store-д бичнэ.
+
+    st.rerun/st.stop нь exception-оор ажилладаг тул finally дотор бичнэ.
+    Өөр ажиллалт дотор (бүтэн хуудсан дээрх fragment) бол гаднахад нь тооцогдоно.
+    """
+    if _current_run.get() is not None:
+        yield
+        return
+    run = _Run()
+    token = _current_run.set(run)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        run.totals["total"] = time.perf_counter() - start
+        _current_run.reset(token)
+        store = get_timing_store()
+        for phase, seconds in run.totals.items():
+            store.add(page, phase, seconds)
+
+
+EMPTY_SECTION_MESSAGE = "Сонгосон шүүлтэд энэ хэсгийн саналын хуудас алга."
+
+
+def plotly_chart(figure, **kwargs):
+    """``st.plotly_chart`` – serialization ба илгээлтийн хугацааг хэмжинэ.
+
+    Figure үүсгэгч хоосон хүснэгтэд None буцаавал st.info харуулна.
+    """
+    if figure is None:
+        st.info(EMPTY_SECTION_MESSAGE)
+        return None
+    with timed("plotly_chart"):
+        return st.plotly_chart(figure, **kwargs)
+
+
+def render_timing_panel():
+    """Sidebar-ын admin самбар: хуудас, үе шат бүрийн p50/p95."""
+    store = get_timing_store()
+    with st.expander("⏱ Хуудасны хугацаа (p50/p95)"):
+        summary = store.summary()
+        if summary.empty:
+            st.caption("Хэмжилт алга")
+            return
+        st.dataframe(summary, hide_index=True, use_container_width=True)
+        st.caption(f"Сүүлийн {store.window} ажиллалт, хуудас бүрээр")
+        if st.button("Цэвэрлэх", key="timing_clear"):
+            store.clear()
+            st.rerun()
@@ -0,0 +1,234 @@
+"""Тайлангийн бүх хүснэгтийг Streamlit-гүйгээр гаргана.
+
+Хуудсууд болон batch ажлууд ижил функцүүдийг ашиглана: функц бүр
+нэгтгэл (``get_aggregates()`` / ``build_aggregates()``)-ээс нэг хүснэгт
+буцаана. CLI нь бүх хүснэгтийг нэг процесст тооцоолж файлд бичнэ.
+
+    python reports.py --output-dir report_tables
+    python reports.py --output-dir report_tables --format parquet
+"""
+import argparse
+import logging
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from aggregates import build_aggregates, district_pair_tables, read_aggregates
+from analytics import PATTERN_LABELS, candidate_party_labels, count_table, top_pairs
+from data_loader import dataset_fingerprint
+
+logger = logging.getLogger(__name__)
+
+PARTY_SET_COLS = ["party_a", "party_b", "party_c", "party_d"]
+
+
+def _labelled_counts(counts, name):
+    """{label: count} -> 0-ээс их мөрүүд count-оор буурахаар."""
+    return (
+        pd.Series(counts)
+        .loc[lambda s: s > 0]
+        .sort_values(ascending=False)
+        .rename_axis(name)
+        .reset_index(name="count")
+    )
+
+
+# ======================================================
+# PAGE 1 – НАМЫН ТУУШТАЙ СОНГОЛТ
+# ======================================================
+def city_party_count_table(aggs):
+    """Хотын 4 сонголт дахь ялгаатай намын тоо (1-4) бүрийн хуудасны тоо."""
+    return (
+        pd.Series(aggs["city_party_count"])
+        .loc[lambda s: s > 0]
+        .sort_index()
+        .rename_axis("n_parties")
+        .reset_index(name="count")
+    )
+
+
+def district_discipline_table(aggs):
+    mixed, single = aggs["district_discipline"]
+    return _labelled_counts({"Нэг нам": single, "Холимог намууд": mixed}, "pattern")
+
+
+# ======================================================
+# PAGE 2 – НАМУУДЫН ХОЛИГДОЛ
+# ======================================================
+def mixing_table(aggs, contest):
+    """Нам × нам холигдлын хүснэгт. ``contest`` нь "city" эсвэл "district"."""
+    matrix = aggs[f"{contest}_mixing"]
+    present = aggs[f"{contest}_parties_present"]
+    labels = aggs["party_labels"][present]
+    return pd.DataFrame(matrix[np.ix_(present, present)], index=labels, columns=labels)
+
+
+# ======================================================
+# PAGE 3 – НЭР ДЭВШИГЧДИЙН ХАМТ СОНГОГДОЛТ
+# ======================================================
+def city_candidate_party_map(aggs):
+    """Хотын нэр дэвшигч -> намын нэр."""
+    return dict(zip(
+        aggs["city_candidate_labels"],
+        candidate_party_labels(aggs["party_labels"], aggs["city_candidate_party"]),
+    ))
+
+
+def city_pair_table(aggs, k=None):
+    return top_pairs(aggs["city_pairs"], aggs["city_candidate_labels"], k=k)
+
+
+def district_pair_table(aggs, labels=None, k=None):
+    """Бүх тойргийн нэгдсэн хосын хүснэгт. ``labels`` нь нэр дэвшигчийн харагдах нэр."""
+    if labels is None:
+        labels = aggs["district_candidate_labels"]
+    return top_pairs(aggs["district_pairs"], labels, k=k)
+
+
+def district_deep_dive_table(pair_tables, district_no, labels):
+    """``district_pair_tables(aggs)``-аас нэг тойргийн хосын хүснэгт."""
+    table = pair_tables[district_no]
+    return pd.DataFrame({
+        "candidate_a": labels[table["candidate_a"]],
+        "candidate_b": labels[table["candidate_b"]],
+        "count": table["count"].to_numpy(),
+    })
+
+
+# ======================================================
+# PAGE 4 – ХОТ–ДҮҮРГИЙН УЯЛДАА
+# ======================================================
+def alignment_table(aggs):
+    not_aligned, aligned = aggs["alignment"]
+    return _labelled_counts({"Уялдсан": aligned, "Уялдаагүй": not_aligned}, "status")
+
+
+def loyalty_table(aggs):
+    other, loyal = aggs["loyalty"]
+    return _labelled_counts({"6/6 Нэг нам": loyal, "Бусад": other}, "pattern")
+
+
+def loyal_party_table(aggs):
+    return count_table(aggs["loyal_party"], [aggs["party_labels"]], ["party"])
+
+
+# ======================================================
+# PAGE 5 – НАМЫН ХОСЛОЛЫН БҮТЭЦ
+# ======================================================
+def pattern_table(aggs):
+    return _labelled_counts(dict(zip(PATTERN_LABELS, aggs["pattern"])), "pattern")
+
+
+def pattern_31_table(aggs):
+    party_labels = aggs["party_labels"]
+    return count_table(
+        aggs["pattern_31"], [party_labels] * 2, ["dominant_party", "minority_party"]
+    )
+
+
+def pattern_22_table(aggs):
+    return count_table(aggs["pattern_22"], [aggs["party_labels"]] * 2, ["party_a", "party_b"])
+
+
+def pattern_211_table(aggs):
+    return count_table(
+        aggs["pattern_211"], [aggs["party_labels"]] * 3, ["core_party", "other_1", "other_2"]
+    )
+
+
+def pattern_1111_table(aggs):
+    return count_table(aggs["pattern_1111"], [aggs["party_labels"]] * 4, PARTY_SET_COLS)
+
+
+def pure_party_table(aggs):
+    return count_table(aggs["pure_party"], [aggs["party_labels"]], ["pure_party"])
+
+
+def minority_candidate_table(aggs):
+    """3-1 хуудсан дээрх цөөнх намын нэр дэвшигч, түүний нам ба давамгай нам."""
+    party_labels = aggs["party_labels"]
+    return count_table(
+        aggs["candidate_31"],
+        [aggs["city_candidate_labels"], party_labels, party_labels],
+        ["candidate", "minority_party", "dominant_party"],
+    )
+
+
+REPORT_TABLES = {
+    "city_party_count": city_party_count_table,
+    "district_discipline": district_discipline_table,
+    "city_mixing": lambda aggs: mixing_table(aggs, "city"),
+    "district_mixing": lambda aggs: mixing_table(aggs, "district"),
+    "city_pairs": city_pair_table,
+    "district_pairs": district_pair_table,
+    "alignment": alignment_table,
+    "loyalty": loyalty_table,
+    "loyal_party": loyal_party_table,
+    "pattern": pattern_table,
+    "pattern_31": pattern_31_table,
+    "pattern_22": pattern_22_table,
+    "pattern_211": pattern_211_table,
+    "pattern_1111": pattern_1111_table,
+    "pure_party": pure_party_table,
+    "minority_candidates": minority_candidate_table,
+}
+
+
+def build_report_tables(aggs):
+    """{нэр: DataFrame} – REPORT_TABLES бүгд болон тойрог бүрийн хосын хүснэгт."""
+    tables = {name: func(aggs) for name, func in REPORT_TABLES.items()}
+
+    labels = aggs["district_candidate_labels"]
+    pair_tables = district_pair_tables(aggs)
+    per_district = [
+        district_deep_dive_table(pair_tables, d, labels).assign(district_no=d)
+        for d in pair_tables
+    ]
+    tables["district_pairs_by_district"] = (
+        pd.concat(per_district, ignore_index=True)
+        if per_district
+        else pd.DataFrame(columns=["candidate_a", "candidate_b", "count", "district_no"])
+    )
+    return tables
+
+
+def write_report_tables(tables, output_dir, fmt="csv"):
+    os.makedirs(output_dir, exist_ok=True)
+    for name, table in tables.items():
+        path = os.path.join(output_dir, f"{name}.{fmt}")
+        # mixing хүснэгтүүдийн index нь намын нэр
+        keep_index = name.endswith("_mixing")
+        if fmt == "parquet":
+            table.to_parquet(path, index=keep_index)
+        else:
+            table.to_csv(path, index=keep_index)
+    return output_dir
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--output-dir", default="report_tables")
+    parser.add_argument("--format", choices=["csv", "parquet"], default="csv")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    start = time.perf_counter()
+    aggs = read_aggregates(dataset_fingerprint())
+    if aggs is None:
+        aggs = build_aggregates()
+
+    tables = build_report_tables(aggs)
+    write_report_tables(tables, args.output_dir, args.format)
+    logger.info(
+        "Wrote %d report tables for %d ballots to %s in %.2fs",
+        len(tables),
+        int(aggs["n_ballots"]),
+        args.output_dir,
+        time.perf_counter() - start,
+    )
+
+
+if __name__ == "__main__":
+    main()
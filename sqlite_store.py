@@ -0,0 +1,264 @@
+"""Саналын хуудсыг индекстэй SQLite файлд хадгалж, шүүлттэй асуулга хийнэ.
+
+Ballot store-ийн part бүрийг нэг нэгээр нь уншиж, derived баганууд
+(намын хослолын бүтэц, 6/6 гэх мэт)-ын хамт ``ballots`` хүснэгтэд
+бичнэ. Шүүлт болон group by-г SQLite индексээр гүйцэтгэх тул зөвхөн
+тохирох мөрүүд уншигдана, өгөгдөл процессын RAM-д бүтнээр орох
+шаардлагагүй. Файл нь dataset fingerprint-тэй холбогдсон тул store
+өөрчлөгдвөл дахин үүснэ.
+
+    python sqlite_store.py                                   # data/ballots.sqlite
+    python sqlite_store.py --count-by district_no --where pattern=3-1
+"""
+import argparse
+import logging
+import os
+import sqlite3
+import threading
+import time
+from contextlib import closing
+
+import numpy as np
+import pandas as pd
+
+from analytics import PATTERN_LABELS, classify_party_patterns
+from ballot_codes import encode_ballots, missing_code
+from data_loader import (
+    CITY_CANDIDATE_COLS,
+    CITY_PARTY_COLS,
+    DISTRICT_CANDIDATE_COLS,
+    DISTRICT_PARTY_COLS,
+    dataset_fingerprint,
+    iter_store_frames,
+)
+
+logger = logging.getLogger(__name__)
+
+SQLITE_PATH = "data/ballots.sqlite"
+
+DERIVED_COLS = [
+    "pattern",
+    "city_party_count",
+    "district_single_party",
+    "city_district_aligned",
+    "seven_of_seven_same_party",
+]
+BALLOT_COLUMNS = (
+    ["district_no"]
+    + CITY_CANDIDATE_COLS + CITY_PARTY_COLS
+    + DISTRICT_CANDIDATE_COLS + DISTRICT_PARTY_COLS
+    + DERIVED_COLS
+)
+INDEXED_COLS = ["district_no"] + CITY_PARTY_COLS + DISTRICT_PARTY_COLS + DERIVED_COLS
+
+_build_lock = threading.Lock()
+_ready = {}
+
+
+# ======================================================
+# BUILD
+# ======================================================
+def _decode(codes, labels):
+    out = np.full(len(codes), None, dtype=object)
+    valid = codes != missing_code(codes)
+    out[valid] = labels[codes[valid]]
+    return out
+
+
+def ballot_rows(df):
+    """Store-ийн frame-ээс ``ballots`` хүснэгтийн мөрүүд (derived баганатай)."""
+    codes = encode_ballots(df)
+    district_no = pd.array(codes.district_no, dtype="Int64")
+    district_no[codes.district_no < 0] = pd.NA
+    rows = {"district_no": district_no}
+
+    for cols, matrix, labels in [
+        (CITY_CANDIDATE_COLS, codes.city_candidate, codes.city_candidate_labels),
+        (CITY_PARTY_COLS, codes.city_party, codes.party_labels),
+        (DISTRICT_CANDIDATE_COLS, codes.district_candidate, codes.district_candidate_labels),
+        (DISTRICT_PARTY_COLS, codes.district_party, codes.party_labels),
+    ]:
+        for i, col in enumerate(cols):
+            rows[col] = _decode(matrix[:, i], labels)
+
+    rows["pattern"] = PATTERN_LABELS[classify_party_patterns(codes.city_party).pattern]
+    rows["city_party_count"] = codes.city_party_count
+    rows["district_single_party"] = codes.district_single_party.astype(np.int8)
+    rows["city_district_aligned"] = codes.city_district_aligned.astype(np.int8)
+    rows["seven_of_seven_same_party"] = codes.seven_of_seven_same_party.astype(np.int8)
+    return pd.DataFrame(rows, columns=BALLOT_COLUMNS)
+
+
+def build_sqlite(path=SQLITE_PATH, fingerprint=None):
+    """Ballot store-оос SQLite файлыг шинээр бичнэ. Бичсэн мөрийн тоог буцаана."""
+    start = time.perf_counter()
+    fingerprint = fingerprint or dataset_fingerprint()
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+
+    n_rows = 0
+    with closing(sqlite3.connect(tmp_path)) as con:
+        con.execute("PRAGMA journal_mode = OFF")
+        con.execute("PRAGMA synchronous = OFF")
+        text_cols = set(CITY_CANDIDATE_COLS + CITY_PARTY_COLS
+                        + DISTRICT_CANDIDATE_COLS + DISTRICT_PARTY_COLS + ["pattern"])
+        columns = ", ".join(
+            f"{c} {'TEXT' if c in text_cols else 'INTEGER'}" for c in BALLOT_COLUMNS
+        )
+        con.execute(f"CREATE TABLE ballots (id INTEGER PRIMARY KEY, {columns})")
+        con.execute("CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT)")
+
+        for df in iter_store_frames():
+            rows = ballot_rows(df)
+            rows.to_sql("ballots", con, if_exists="append", index=False, chunksize=50_000)
+            n_rows += len(rows)
+
+        # Индексийг өгөгдөл бичсэний дараа үүсгэх нь хурдан
+        for col in INDEXED_COLS:
+            con.execute(f"CREATE INDEX idx_ballots_{col} ON ballots ({col})")
+        con.execute("INSERT INTO meta VALUES ('fingerprint', ?)", (fingerprint,))
+        con.execute("ANALYZE")
+        con.commit()
+
+    os.replace(tmp_path, path)
+    logger.info(
+        "SQLite store built: %d rows in %.2fs, %.1f MB",
+        n_rows, time.perf_counter() - start, os.path.getsize(path) / 1024 ** 2,
+    )
+    return n_rows
+
+
+def _sqlite_fingerprint(path):
+    if not os.path.exists(path):
+        return None
+    with closing(sqlite3.connect(f"file:{path}?mode=ro", uri=True)) as con:
+        try:
+            row = con.execute("SELECT value FROM meta WHERE key = 'fingerprint'").fetchone()
+        except sqlite3.DatabaseError:
+            return None
+    return row[0] if row else None
+
+
+def ensure_sqlite(path=SQLITE_PATH):
+    """Файл одоогийн dataset-тэй таарч байгааг баталгаажуулж, замыг буцаана."""
+    fingerprint = dataset_fingerprint()
+    if _ready.get(path) == fingerprint:
+        return path
+    with _build_lock:
+        if _sqlite_fingerprint(path) != fingerprint:
+            build_sqlite(path, fingerprint)
+        _ready[path] = fingerprint
+    return path
+
+
+# ======================================================
+# QUERY API
+# ======================================================
+def connect(path=SQLITE_PATH):
+    """Уншихад зориулсан холболт. Thread бүр өөрийн холболтыг ашиглана."""
+    return sqlite3.connect(f"file:{ensure_sqlite(path)}?mode=ro", uri=True)
+
+
+def _check_columns(columns):
+    unknown = [c for c in columns if c not in BALLOT_COLUMNS]
+    if unknown:
+        raise ValueError(f"Unknown ballot columns: {unknown}")
+
+
+def _where(filters):
+    """{багана: утга} -> (WHERE хэсэг, параметрүүд).
+
+    Утга нь scalar (=), list/tuple/set (IN), эсвэл None (IS NULL).
+    """
+    _check_columns(filters)
+    clauses, params = [], []
+    for col, value in filters.items():
+        if value is None:
+            clauses.append(f"{col} IS NULL")
+        elif isinstance(value, (list, tuple, set, frozenset)):
+            value = list(value)
+            clauses.append(f"{col} IN ({', '.join('?' * len(value))})")
+            params.extend(value)
+        else:
+            clauses.append(f"{col} = ?")
+            params.append(value)
+    where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+    return where, [_sql_value(v) for v in params]
+
+
+def _sql_value(value):
+    # numpy scalar-ууд (np.int64, np.bool_) sqlite3-д шууд очдоггүй
+    return value.item() if isinstance(value, np.generic) else value
+
+
+def count_ballots(group_by=(), path=SQLITE_PATH, **filters):
+    """Шүүлтэд тохирох хуудсын тоо ``group_by`` багана бүрээр.
+
+        count_ballots(["party_1"], district_no=7, pattern="3-1")
+    """
+    group_by = list(group_by)
+    _check_columns(group_by)
+    where, params = _where(filters)
+    select = ", ".join(group_by + ["COUNT(*) AS count"])
+    sql = f"SELECT {select} FROM ballots{where}"
+    if group_by:
+        cols = ", ".join(group_by)
+        sql += f" GROUP BY {cols} ORDER BY count DESC, {cols}"
+    with closing(connect(path)) as con:
+        return pd.read_sql_query(sql, con, params=params)
+
+
+def select_ballots(columns=None, limit=None, path=SQLITE_PATH, **filters):
+    """Шүүлтэд тохирох саналын хуудсууд (зөвхөн ``columns`` баганууд)."""
+    columns = list(columns or BALLOT_COLUMNS)
+    _check_columns(columns)
+    where, params = _where(filters)
+    sql = f"SELECT {', '.join(columns)} FROM ballots{where} ORDER BY id"
+    if limit is not None:
+        sql += " LIMIT ?"
+        params.append(int(limit))
+    with closing(connect(path)) as con:
+        return pd.read_sql_query(sql, con, params=params)
+
+
+def _parse_filter(text):
+    col, _, value = text.partition("=")
+    if "," in value:
+        return col, [_parse_value(v) for v in value.split(",")]
+    return col, _parse_value(value)
+
+
+def _parse_value(value):
+    try:
+        return int(value)
+    except ValueError:
+        return value
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--path", default=SQLITE_PATH)
+    parser.add_argument("--rebuild", action="store_true")
+    parser.add_argument("--count-by", nargs="*", metavar="COLUMN")
+    parser.add_argument(
+        "--where", nargs="*", default=[], metavar="COLUMN=VALUE",
+        help="шүүлт; олон утгыг таслалаар (party_1=МАН,АН)",
+    )
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    if args.rebuild:
+        build_sqlite(args.path)
+    ensure_sqlite(args.path)
+
+    if args.count_by is not None:
+        filters = dict(_parse_filter(f) for f in args.where)
+        start = time.perf_counter()
+        result = count_ballots(args.count_by, args.path, **filters)
+        print(result.to_string(index=False))
+        logger.info("Query in %.3fs", time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,287 @@
+"""Тайлангийн хуудсуудыг статик HTML болгон нэг удаа экспортлоно.
+
+Хуудас бүрийг Streamlit-ийн headless AppTest-ээр ажиллуулж, бүх tab,
+key-тэй expander-ийг нээж, гарсан элементүүдийг (markdown, metric,
+хүснэгт, Plotly график) HTML болгоно. Key-тэй selectbox-ийн сонголт бүрт
+(page3-ын тойрог бүр) тусдаа HTML үүснэ. Гаралтыг ямар ч статик
+сервер Python ажиллуулалгүй үйлчилнэ.
+
+    python static_export.py --output-dir site
+    python static_export.py --output-dir site --inline-js
+"""
+import argparse
+import html
+import json
+import logging
+import os
+import re
+import time
+
+import markdown
+import plotly.io as pio
+from plotly.offline import get_plotlyjs
+from streamlit.testing.v1 import AppTest
+
+logger = logging.getLogger(__name__)
+
+# app.py-ийн navigation-тай ижил дараалал: (script, гаралтын файл, гарчиг)
+PAGES = [
+    ("home.py", "index", "ДАТАСЕТ ТОВЧ ТАЙЛАН"),
+    ("page1.py", "overview", "OVERVIEW"),
+    ("page2.py", "party-mixing", "PARTY MIXING"),
+    ("page5.py", "party-combination", "PARTY COMBINATION (CITY)"),
+    ("page3.py", "candidate-behavior", "CANDIDATE BEHAVIOR"),
+    ("page4.py", "cross-contest-alignment", "CROSS-CONTEST ALIGNMENT"),
+]
+PLOTLY_JS = "plotly.min.js"
+RUN_TIMEOUT = 300
+
+PAGE_TEMPLATE = """<!DOCTYPE html>
+<html lang="mn">
+<head>
+<meta charset="utf-8">
+<meta name="viewport" content="width=device-width, initial-scale=1">
+<title>{title}</title>
+{plotly_js}
+<style>
+body {{ font-family: Arial, sans-serif; margin: 0; color: #31333f; }}
+nav {{ background: #f0f2f6; padding: 12px 24px; }}
+nav a {{ margin-right: 18px; color: #31333f; text-decoration: none; }}
+nav a.active {{ font-weight: bold; }}
+main {{ max-width: 1200px; margin: 0 auto; padding: 24px; }}
+section.tab {{ border-top: 2px solid #ff4b4b; margin-top: 32px; }}
+details {{ border: 1px solid #e6e9ef; border-radius: 6px; padding: 8px 16px; margin: 16px 0; }}
+summary {{ cursor: pointer; font-weight: bold; }}
+.columns {{ display: flex; gap: 24px; }}
+.columns > div {{ flex: 1; }}
+.metric .label {{ font-size: 14px; }}
+.metric .value {{ font-size: 32px; }}
+.caption {{ color: #808495; font-size: 14px; }}
+table {{ border-collapse: collapse; margin: 12px 0; }}
+th, td {{ border: 1px solid #e6e9ef; padding: 4px 10px; }}
+</style>
+</head>
+<body>
+<nav>{nav}</nav>
+<main>
+{body}
+</main>
+</body>
+</html>
+"""
+
+
+# ======================================================
+# ЭЛЕМЕНТ -> HTML
+# ======================================================
+def _markdown(text):
+    return markdown.markdown(text, extensions=["tables", "sane_lists"])
+
+
+def _plotly_html(element):
+    spec = json.loads(element.proto.spec)
+    config = json.loads(element.proto.config or "{}")
+    return pio.to_html(
+        spec, include_plotlyjs=False, full_html=False, validate=False, config=config
+    )
+
+
+def render_element(node, tabs=None):
+    """AppTest-ийн элемент (мод)-ийг HTML болгоно.
+
+    ``tabs`` нь {tab container key: {label: html}} – tab бүрийг тусдаа
+    ажиллуулалтаар барьж авсан агуулга.
+    """
+    kind = node.type
+    children = getattr(node, "children", None)
+
+    if kind == "title":
+        return f"<h1>{html.escape(node.value)}</h1>"
+    if kind in ("header", "subheader"):
+        tag = "h2" if kind == "header" else "h3"
+        return f"<{tag}>{html.escape(node.value)}</{tag}>"
+    if kind == "markdown":
+        return _markdown(node.value)
+    if kind == "caption":
+        return f'<div class="caption">{_markdown(node.value)}</div>'
+    if kind == "metric":
+        return (
+            f'<div class="metric"><div class="label">{html.escape(node.label)}</div>'
+            f'<div class="value">{html.escape(str(node.value))}</div></div>'
+        )
+    if kind == "dataframe":
+        return node.value.to_html(index=False, border=0)
+    if kind == "plotly_chart":
+        return _plotly_html(node)
+    if kind == "tab_container" and tabs is not None and node.key in tabs:
+        return "\n".join(
+            f'<section class="tab"><h2>{html.escape(label)}</h2>\n{body}\n</section>'
+            for label, body in tabs[node.key].items()
+        )
+    if kind == "expander":
+        inner = _render_children(children, tabs)
+        return f"<details open><summary>{html.escape(node.label)}</summary>\n{inner}\n</details>"
+    if kind == "tab":
+        return _render_children(children, tabs)
+    if kind == "flex_container" and children and all(
+        c.type == "column" for c in children.values()
+    ):
+        cols = "".join(f"<div>{_render_children(c.children, tabs)}</div>" for c in children.values())
+        return f'<div class="columns">{cols}</div>'
+    if isinstance(children, dict):
+        return _render_children(children, tabs)
+    # selectbox, button гэх мэт widget-ууд статик хуудсанд хэрэггүй
+    return ""
+
+
+def _render_children(children, tabs=None):
+    return "\n".join(filter(None, (render_element(c, tabs) for c in children.values())))
+
+
+# ======================================================
+# ХУУДАС АЖИЛЛУУЛАХ
+# ======================================================
+def _find(node, kind):
+    if node.type == kind:
+        yield node
+    children = getattr(node, "children", None)
+    if isinstance(children, dict):
+        for child in children.values():
+            yield from _find(child, kind)
+
+
+def _run(app, state):
+    # AppTest widget-ийн утгыг ажиллуулалт бүрт сэргээдэг тул дахин өгнө
+    for key, value in state.items():
+        app.session_state[key] = value
+    app.run()
+    if app.exception:
+        raise RuntimeError(app.exception[0].message)
+    # Шинээр гарч ирсэн key-тэй expander-уудыг нээлттэй болгоно
+    opened = {e.key: True for e in _find(app.main, "expander") if e.key}
+    if opened.keys() - state.keys():
+        state.update(opened)
+        return _run(app, state)
+    return app
+
+
+def _open_tab(app, container_key, label):
+    container = next(c for c in _find(app.main, "tab_container") if c.key == container_key)
+    return next(t for t in container.children.values() if t.label == label)
+
+
+def export_page(script, title=None):
+    """(хуудасны HTML body, [(хувилбарын нэр, HTML body), ...])."""
+    app = AppTest.from_file(script, default_timeout=RUN_TIMEOUT)
+    state = {}
+    _run(app, state)
+
+    tabs = {}
+    variants = []
+    containers = [(c.key, [t.label for t in c.children.values()])
+                  for c in _find(app.main, "tab_container") if c.key]
+    for key, labels in containers:
+        tabs[key] = {}
+        for label in labels:
+            state[key] = label
+            _run(app, state)
+            tab = _open_tab(app, key, label)
+            tabs[key][label] = render_element(tab)
+            variants.extend(_export_variants(app, state, key, label, title))
+
+    return render_element(app.main, tabs), variants
+
+
+def _export_variants(app, state, container_key, label, title):
+    """Нээлттэй tab доторх key-тэй selectbox-ийн сонголт бүрийн HTML."""
+    heading = f"{title} – {label}" if title else label
+    variants = []
+    boxes = [(b.key, list(b.options)) for b in _find(_open_tab(app, container_key, label), "selectbox")]
+    for box_key, options in boxes:
+        if not box_key:
+            continue
+        for i, option in enumerate(options):
+            next(b for b in _find(app.main, "selectbox") if b.key == box_key).select_index(i)
+            _run(app, state)
+            body = render_element(_open_tab(app, container_key, label))
+            variants.append((
+                f"{box_key}-{option}",
+                f"<h1>{html.escape(heading)}</h1>\n<h2>{html.escape(option)}</h2>\n{body}",
+            ))
+    return variants
+
+
+def _slug(text):
+    return re.sub(r"[^\w-]+", "-", str(text)).strip("-").lower()
+
+
+def _nav(active):
+    links = []
+    for _, name, title in PAGES:
+        css = ' class="active"' if name == active else ""
+        links.append(f'<a href="{name}.html"{css}>{html.escape(title)}</a>')
+    return "".join(links)
+
+
+def _variant_links(name, variants):
+    links = "".join(
+        f'<li><a href="{name}-{_slug(variant)}.html">{html.escape(variant)}</a></li>'
+        for variant, _ in variants
+    )
+    return f"<h2>Хувилбарууд</h2>\n<ul>{links}</ul>"
+
+
+def export_site(output_dir, inline_js=False):
+    """Бүх хуудсыг ``output_dir``-д бичээд бичсэн файлуудын жагсаалтыг буцаана."""
+    os.makedirs(output_dir, exist_ok=True)
+    if inline_js:
+        plotly_js = f'<script type="text/javascript">{get_plotlyjs()}</script>'
+    else:
+        with open(os.path.join(output_dir, PLOTLY_JS), "w", encoding="utf-8") as f:
+            f.write(get_plotlyjs())
+        plotly_js = f'<script src="{PLOTLY_JS}"></script>'
+
+    written = []
+
+    def write(filename, title, active, body):
+        path = os.path.join(output_dir, filename)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(PAGE_TEMPLATE.format(
+                title=html.escape(title), plotly_js=plotly_js, nav=_nav(active), body=body
+            ))
+        written.append(path)
+
+    for script, name, title in PAGES:
+        start = time.perf_counter()
+        body, variants = export_page(script, title)
+        if variants:
+            body += "\n" + _variant_links(name, variants)
+        write(f"{name}.html", title, name, body)
+        for variant, variant_body in variants:
+            write(f"{name}-{_slug(variant)}.html", f"{title} – {variant}", name, variant_body)
+        logger.info(
+            "Exported %s (%d variants) in %.2fs", script, len(variants), time.perf_counter() - start
+        )
+    return written
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--output-dir", default="site")
+    parser.add_argument(
+        "--inline-js", action="store_true",
+        help="plotly.js-ийг хуудас бүрт шигтгэнэ (файл тус бүр бие даасан)",
+    )
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    start = time.perf_counter()
+    written = export_site(args.output_dir, args.inline_js)
+    logger.info(
+        "Wrote %d HTML files to %s in %.2fs",
+        len(written), args.output_dir, time.perf_counter() - start,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,282 @@
+"""final_cleaned.csv схемтэй синтетик саналын хуудас үүсгэнэ (ачааллын тест).
+
+Дүүргийн нэр дэвшигчид contest_2_names_clean.csv-ээс, хотын 32 нэр
+дэвшигч (нам бүрт 4) синтетик нэртэй. Сонгогч бүр "суурь" намтай бөгөөд
+сонгогчдын ``straight_ticket`` хувь нь хотод 4 саналаа бүгдийг суурь намдаа
+өгнө. Бусад сонголт бүр ``city_loyalty`` / ``district_loyalty`` магадлалаар
+суурь намд, үгүй бол намын жингээр санамсаргүй намд очно.
+
+    python synth_ballots.py 1000000                 # data/synthetic_ballots.csv
+    python synth_ballots.py 10000000 --store --workers 8
+"""
+import argparse
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from data_loader import (
+    CITY_CANDIDATE_COLS,
+    CITY_PARTY_COLS,
+    CONTESTANTS_PATH,
+    DISTRICT_CANDIDATE_COLS,
+    DISTRICT_PARTY_COLS,
+    to_compact_dtypes,
+    write_store,
+)
+
+logger = logging.getLogger(__name__)
+
+CITY_CONTEST = "Нийслэлийн ИТХ"
+CITY_CANDIDATES_PER_PARTY = 4
+
+
+@dataclass(frozen=True)
+class SyntheticConfig:
+    """Синтетик сонгогчдын зан төлөвийн параметрүүд."""
+
+    straight_ticket: float = 0.65   # хотын 4 сонголтоо бүгдийг суурь намд өгөх сонгогчийн хувь
+    city_loyalty: float = 0.5       # бусад сонгогчийн 2-4-р сонголт суурь намд очих магадлал
+    district_loyalty: float = 0.85  # дүүргийн сонголт бүр дүүргийн суурь намд очих
+    alignment: float = 0.85         # дүүргийн суурь нам = хотын суурь нам байх магадлал
+    party_weights: tuple = None     # намын алдартай байдал (None = жишиг файлын нэр дэвшигчийн тоогоор)
+
+
+@dataclass(frozen=True)
+class CandidateUniverse:
+    parties: np.ndarray
+    party_weights: np.ndarray
+    city_candidates: np.ndarray
+    city_candidate_party: np.ndarray
+    district_candidates: np.ndarray       # давхардаагүй нэрс
+    district_candidate_code: np.ndarray   # district, party-аар эрэмбэлэгдсэн мөр бүрийн нэрийн код
+    district_candidate_party: np.ndarray
+    districts: np.ndarray
+    district_start: np.ndarray            # districts[i]-ийн нэр дэвшигчид: start:start + count
+    district_count: np.ndarray
+    district_party_start: np.ndarray      # (district, party) муж
+    district_party_count: np.ndarray
+
+
+def load_universe(path=CONTESTANTS_PATH, party_weights=None):
+    ref = pd.read_csv(path)
+    counts = ref["party"].value_counts()
+    parties = counts.index.to_numpy(dtype=object)
+
+    if party_weights is None:
+        weights = counts.to_numpy(dtype=np.float64)
+    else:
+        weights = np.asarray(party_weights, dtype=np.float64)
+    weights = weights / weights.sum()
+
+    n_parties = len(parties)
+    city_party = np.repeat(np.arange(n_parties), CITY_CANDIDATES_PER_PARTY)
+    city_candidates = np.array(
+        [f"Нэр{i} ОВОГ{i}" for i in range(len(city_party))], dtype=object
+    )
+
+    # (district, party) бүрийн нэр дэвшигчид үргэлжилсэн муж болохоор эрэмбэлнэ
+    party_code = pd.Categorical(ref["party"], categories=parties).codes.astype(np.int64)
+    district_code, districts = pd.factorize(ref["district"], sort=True)
+    order = np.lexsort((party_code, district_code))
+    party_code, district_code = party_code[order], district_code[order]
+    candidate_code, candidate_names = pd.factorize(ref["candidate"].to_numpy()[order])
+    starts = np.searchsorted(district_code, np.arange(len(districts)))
+    dp_key = district_code * n_parties + party_code
+    dp_start = np.searchsorted(dp_key, np.arange(len(districts) * n_parties))
+    dp_count = np.bincount(dp_key, minlength=len(districts) * n_parties)
+
+    return CandidateUniverse(
+        parties=parties,
+        party_weights=weights,
+        city_candidates=city_candidates,
+        city_candidate_party=city_party,
+        district_candidates=np.asarray(candidate_names, dtype=object),
+        district_candidate_code=candidate_code,
+        district_candidate_party=party_code,
+        districts=np.asarray(districts),
+        district_start=starts,
+        district_count=np.bincount(district_code, minlength=len(districts)),
+        district_party_start=dp_start.reshape(len(districts), n_parties),
+        district_party_count=dp_count.reshape(len(districts), n_parties),
+    )
+
+
+def _uniform_below(rng, high):
+    """0 <= x < high (high нь мөр бүрт өөр) бүхэл тоо."""
+    return (rng.random(len(high)) * high).astype(np.int64)
+
+
+def _city_picks(rng, universe, base, config):
+    """(n, 4) хотын нэр дэвшигчийн индекс – мөр бүрт давхардалгүй."""
+    n = len(base)
+    n_parties = len(universe.parties)
+    loyal = rng.random((n, 4)) < config.city_loyalty
+    loyal[:, 0] = True
+    loyal |= (rng.random(n) < config.straight_ticket)[:, None]
+    random_party = rng.choice(n_parties, size=(n, 4), p=universe.party_weights)
+    party = np.where(loyal, base[:, None], random_party)
+
+    # Нэг намын k дахь сонголт тухайн намын (offset + k) % 4-р нэр дэвшигч
+    offset = rng.integers(0, CITY_CANDIDATES_PER_PARTY, size=(n, 4))
+    picks = np.empty((n, 4), dtype=np.int64)
+    for j in range(4):
+        same = party[:, :j + 1] == party[:, j:j + 1]
+        first = np.argmax(same, axis=1)
+        occurrence = same.sum(axis=1) - 1
+        slot = (offset[np.arange(n), first] + occurrence) % CITY_CANDIDATES_PER_PARTY
+        picks[:, j] = party[:, j] * CITY_CANDIDATES_PER_PARTY + slot
+    return picks
+
+
+def _district_picks(rng, universe, base, config):
+    """(n,) тойргийн индекс ба (n, 2) дүүргийн нэр дэвшигчийн индекс."""
+    n = len(base)
+    n_parties = len(universe.parties)
+    district = rng.integers(0, len(universe.districts), n)
+    d_start = universe.district_start[district]
+    d_count = universe.district_count[district]
+
+    aligned = rng.random(n) < config.alignment
+    party = np.where(aligned, base, rng.choice(n_parties, n, p=universe.party_weights))
+    p_start = universe.district_party_start[district, party]
+    p_count = universe.district_party_count[district, party]
+
+    # 1-р сонголт
+    loyal = (rng.random(n) < config.district_loyalty) & (p_count > 0)
+    first = np.where(
+        loyal,
+        p_start + _uniform_below(rng, np.maximum(p_count, 1)),
+        d_start + _uniform_below(rng, d_count),
+    )
+
+    # 2-р сонголт – 1-р сонголтоос өөр
+    in_party = (first >= p_start) & (first < p_start + p_count)
+    loyal = (
+        (rng.random(n) < config.district_loyalty)
+        & (p_count - in_party > 0)
+    )
+    party_pick = np.where(
+        in_party,
+        p_start + (first - p_start + 1 + _uniform_below(rng, np.maximum(p_count - 1, 1))) % np.maximum(p_count, 1),
+        p_start + _uniform_below(rng, np.maximum(p_count, 1)),
+    )
+    district_pick = d_start + (
+        first - d_start + 1 + _uniform_below(rng, np.maximum(d_count - 1, 1))
+    ) % d_count
+    second = np.where(loyal, party_pick, district_pick)
+    return district, np.column_stack([first, second])
+
+
+def generate_ballots(n_ballots, config=SyntheticConfig(), seed=None, universe=None):
+    """n_ballots синтетик саналын хуудас – final_cleaned.csv-ийн багануудтай frame.
+
+    Текст баганууд categorical тул 10M мөр ч санах ойд багтана.
+    """
+    rng = np.random.default_rng(seed)
+    if universe is None:
+        universe = load_universe(party_weights=config.party_weights)
+
+    base = rng.choice(len(universe.parties), n_ballots, p=universe.party_weights)
+    city = _city_picks(rng, universe, base, config)
+    district, district_cands = _district_picks(rng, universe, base, config)
+
+    def labels(codes, categories):
+        return pd.Categorical.from_codes(codes, categories=categories)
+
+    out = {"contest_city": labels(np.zeros(n_ballots, dtype=np.int8), [CITY_CONTEST])}
+    for j, (cand_col, party_col) in enumerate(zip(CITY_CANDIDATE_COLS, CITY_PARTY_COLS)):
+        out[cand_col] = labels(city[:, j], universe.city_candidates)
+        out[party_col] = labels(universe.city_candidate_party[city[:, j]], universe.parties)
+    out["district_no"] = universe.districts[district]
+    for j, (cand_col, party_col) in enumerate(zip(DISTRICT_CANDIDATE_COLS, DISTRICT_PARTY_COLS)):
+        picks = district_cands[:, j]
+        out[cand_col] = labels(
+            universe.district_candidate_code[picks], universe.district_candidates
+        )
+        out[party_col] = labels(universe.district_candidate_party[picks], universe.parties)
+
+    return pd.DataFrame(out)
+
+
+# ======================================================
+# CHUNKED / PARALLEL GENERATION
+# ======================================================
+def _generate_chunk(args):
+    n_ballots, config, seed, compact = args
+    df = generate_ballots(n_ballots, config, seed)
+    return to_compact_dtypes(df) if compact else df
+
+
+def iter_ballot_chunks(n_ballots, chunk_size=1_000_000, config=SyntheticConfig(),
+                       seed=0, workers=1, compact=False):
+    """n_ballots-ийг chunk_size хэсгүүдээр үүсгэнэ.
+
+    Chunk бүр SeedSequence-ээс тусдаа seed авдаг тул үр дүн ``workers``-ээс
+    үл хамааран ижил. ``workers > 1`` бол процессуудад тараана.
+    ``compact=True`` бол store-д бичихэд бэлэн (to_compact_dtypes) frame.
+    """
+    sizes = [min(chunk_size, n_ballots - start) for start in range(0, n_ballots, chunk_size)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    tasks = [(size, config, s, compact) for size, s in zip(sizes, seeds)]
+
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            yield from executor.map(_generate_chunk, tasks)
+    else:
+        yield from map(_generate_chunk, tasks)
+
+
+def write_csv(chunks, path):
+    n_rows = 0
+    for i, chunk in enumerate(chunks):
+        chunk.to_csv(path, mode="w" if i == 0 else "a", header=i == 0, index=False)
+        n_rows += len(chunk)
+    return n_rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("n_ballots", type=int)
+    parser.add_argument("--output", default="data/synthetic_ballots.csv")
+    parser.add_argument("--store", action="store_true",
+                        help="CSV биш шууд ballot store (Parquet) болгон бичнэ")
+    parser.add_argument("--chunk-size", type=int, default=1_000_000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--straight-ticket", type=float, default=SyntheticConfig.straight_ticket)
+    parser.add_argument("--city-loyalty", type=float, default=SyntheticConfig.city_loyalty)
+    parser.add_argument("--district-loyalty", type=float, default=SyntheticConfig.district_loyalty)
+    parser.add_argument("--alignment", type=float, default=SyntheticConfig.alignment)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    start = time.perf_counter()
+    config = SyntheticConfig(
+        straight_ticket=args.straight_ticket,
+        city_loyalty=args.city_loyalty,
+        district_loyalty=args.district_loyalty,
+        alignment=args.alignment,
+    )
+    chunks = iter_ballot_chunks(
+        args.n_ballots, args.chunk_size, config, args.seed, args.workers,
+        compact=args.store,
+    )
+
+    if args.store:
+        n_rows = write_store(chunks, source="synth_ballots")
+        target = "ballot store"
+    else:
+        n_rows = write_csv(chunks, args.output)
+        target = args.output
+    logger.info(
+        "Generated %d ballots in %.2fs -> %s", n_rows, time.perf_counter() - start, target
+    )
+
+
+if __name__ == "__main__":
+    main()